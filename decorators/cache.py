@@ -6,6 +6,7 @@
 @Desc    ：缓存装饰器
 """
 
+import functools
 import time
 from typing import Any, Callable
 
@@ -15,36 +16,14 @@ from typing import Any, Callable
 # redis_client = Redis(host='localhost', port=6379, db=0)
 
 
-# 缓存结果
-def memoize(func):
-    cache = {}
-
-    def wrapper(*args):
-        if args in cache:
-            return cache[args]
-        result = func(*args)
-        cache[args] = result
-        return result
-
-    return wrapper
-
+# 缓存结果，不限容量；functools.cache 由C实现，命中缓存时不经过Python层的包装函数
+memoize = functools.cache
 
-def cache_decorator(func):
-    cache = dict()
+# 缓存结果(支持关键字参数)，最多保留1024条，超出时淘汰最久未使用的结果
+cache_decorator = functools.lru_cache(maxsize=1024)
 
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        key = (args, tuple(kwargs.items()))
-        if key not in cache:
-            cache[key] = func(*args, **kwargs)
-        return cache[key]
-
-    return wrapper
-
-
-####### 也可以使用functools.lru_cache来实现缓存装饰器的效果
-import functools
 
+####### 也可以直接使用functools.lru_cache来实现缓存装饰器的效果
 
 @functools.lru_cache(maxsize=None)
 def example_function(x, y):
@@ -367,8 +367,10 @@ class UserService:
 @cache_methods
 class ExpensiveCalculator:
     def fibonacci(self, n):
-        if n <= 1:
-            return n
-        return self.fibonacci(n-1) + self.fibonacci(n-2)
+        # 迭代计算，不受递归深度限制；相同n的重复调用由cache_methods直接返回
+        a, b = 0, 1
+        for _ in range(n):
+            a, b = b, a + b
+        return a
 
 """
@@ -6,6 +6,7 @@
 @Desc    ：Titan validate.py
 """
 
+import inspect
 import time
 import warnings
 from functools import wraps
@@ -26,14 +27,25 @@ def validate_input(func):
 
 # 类型检查装饰器
 def type_check(func):
+    # 装饰时预先取出位置参数的(下标, 注解类型)，调用时只遍历这个固定元组
+    positional = (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+    checks = tuple(
+        (index, param.annotation)
+        for index, param in enumerate(inspect.signature(func).parameters.values())
+        if param.kind in positional
+        and isinstance(param.annotation, type)
+        and param.annotation is not inspect.Parameter.empty
+    )
+
     @wraps(func)
     def wrapper(*args, **kwargs):
-        # 获取函数的参数注解
-        annotations = func.__annotations__
-
-        # 遍历参数和注解，检查类型是否正确
-        for arg, annotation in zip(args, annotations.values()):
-            if not isinstance(arg, annotation):
+        # 遍历参数和注解，检查类型是否正确；类型完全一致时跳过isinstance
+        count = len(args)
+        for index, annotation in checks:
+            if index >= count:
+                break
+            arg = args[index]
+            if arg.__class__ is not annotation and not isinstance(arg, annotation):
                 raise TypeError(f"参数 {arg} 的类型应为 {annotation}，但实际类型为 {type(arg)}")
 
         # 调用原始函数
@@ -69,26 +81,35 @@ def deprecated(func):
 
 # ---------------------------------- 性能度量器
 import cProfile
+import itertools
 from functools import wraps
 from loguru import logger
 
 
-def performance_metric(func):
+def performance_metric(func, sample_every: int = 1000):
+    """
+    性能度量：每次调用只记录perf_counter_ns耗时，首次及之后每sample_every次调用用cProfile完整度量一次
+
+    cProfile会拖慢被调用链上的每个函数，始终开启时度量本身就成了瓶颈
+    """
+    calls = itertools.count()
+
     @wraps(func)
     def wrapper(*args, **kwargs):
-        # 使用cProfile进行性能度量
-        profiler = cProfile.Profile()
-        # 启动性能度量
-        profiler.enable()
-        # 执行函数
+        if next(calls) % sample_every == 0:
+            # 使用cProfile进行性能度量
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                # 停止性能度量并打印结果
+                profiler.disable()
+                profiler.print_stats("cumulative")
+
+        start = time.perf_counter_ns()
         result = func(*args, **kwargs)
-        # 停止性能度量
-        profiler.disable()
-        # 打印性能度量结果
-        profiler.print_stats()
-        # 清除性能度量
-        # profiler.clear()
-        # 调用原始函数
+        logger.debug("{} 耗时: {}ns", func.__name__, time.perf_counter_ns() - start)
         return result
 
     return wrapper
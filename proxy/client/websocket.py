@@ -10,13 +10,16 @@ import argparse
 import asyncio
 import json
 import time
+from collections import deque
 from enum import Enum, auto
 from typing import Any, Callable, Dict, Optional, Union
 
+import msgpack
 import websockets
 from websockets.exceptions import ConnectionClosed, ConnectionClosedError, ConnectionClosedOK
 
 from logic.config import get_logger
+from utils.system import uvloop_loop_factory
 
 logger = get_logger("proxy-websocket")
 
@@ -97,8 +100,9 @@ class WebSocketClient:
         # 任务管理
         self.tasks = []
 
-        # 消息队列
-        self.send_queue = asyncio.Queue()
+        # 消息队列：deque + 单个唤醒future，发送任务空闲时才创建future等待
+        self.send_queue: deque = deque()
+        self._send_waiter: Optional[asyncio.Future] = None
 
         # 事件回调
         self.on_connect_callbacks = []
@@ -268,7 +272,12 @@ class WebSocketClient:
             message: 要发送的消息，可以是字典、字符串或字节
         """
         # 将消息放入队列，由发送任务处理
-        await self.send_queue.put(message)
+        self.send_queue.append(message)
+
+        # 唤醒正在等待的发送任务
+        waiter = self._send_waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
 
     async def _send_worker(self):
         """消息发送工作线程"""
@@ -278,8 +287,17 @@ class WebSocketClient:
                     await asyncio.sleep(0.1)
                     continue
 
+                # 队列为空时等待send_message唤醒
+                if not self.send_queue:
+                    self._send_waiter = asyncio.get_running_loop().create_future()
+                    try:
+                        await self._send_waiter
+                    finally:
+                        self._send_waiter = None
+                    continue
+
                 # 从队列获取消息
-                message = await self.send_queue.get()
+                message = self.send_queue.popleft()
 
                 # 转换消息格式
                 if isinstance(message, dict):
@@ -287,9 +305,6 @@ class WebSocketClient:
 
                 # 发送消息
                 await self.websocket.send(message)
-
-                # 标记任务完成
-                self.send_queue.task_done()
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -348,6 +363,8 @@ class WebSocketClient:
 
     async def _heartbeat_worker(self):
         """心跳检测工作线程"""
+        # 按单调时钟截止时间调度，发送和重连耗时不会让心跳周期逐渐漂移
+        next_deadline = time.monotonic() + self.ping_interval
         while not self.should_exit:
             try:
                 if self.state != WebSocketState.CONNECTED:
@@ -368,15 +385,19 @@ class WebSocketClient:
                     if self.auto_reconnect:
                         await self.reconnect()
 
-                # 等待到下一个心跳周期
-                await asyncio.sleep(self.ping_interval)
+                # 等待到下一个心跳截止时间；落后超过一个周期(如重连)时重新对齐，不连续补发
+                now = time.monotonic()
+                if now > next_deadline + self.ping_interval:
+                    next_deadline = now
+                await asyncio.sleep(max(0.0, next_deadline - now))
+                next_deadline += self.ping_interval
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"心跳检测时出错: {str(e)}")
                 await asyncio.sleep(1)
 
-    async def _process_message(self, message: str):
+    async def _process_message(self, message: Union[str, bytes]):
         """
         处理接收到的消息
 
@@ -387,13 +408,13 @@ class WebSocketClient:
             # 更新最后pong时间，表示连接活跃
             self.last_pong_time = time.time()
 
-            # 检查是否为非JSON消息
+            # 检查是否为空消息
             if not message or not message.strip():
                 logger.debug("接收到空消息")
                 return
 
-            # 尝试解析JSON
-            data = json.loads(message)
+            # 二进制帧为MessagePack编码（连接地址带 ?format=msgpack 时服务端发送），文本帧为JSON
+            data = msgpack.unpackb(message) if isinstance(message, bytes) else json.loads(message)
 
             # 记录接收到的消息
             log_message = json.dumps(data, ensure_ascii=False)
@@ -401,31 +422,45 @@ class WebSocketClient:
                 log_message = log_message[:100] + "..."
             # logger.debug(f"接收到数据: {log_message}")
 
-            # 根据消息类型调用对应的处理器
-            message_type = data.get("type") or data.get("action") or data.get("status")
+            # 服务端合并发送的通知批次，逐条分发给处理器
+            if data.get("type") == "batch":
+                for item in data.get("items", []):
+                    await self._dispatch_message(item)
+                return
 
-            if message_type and message_type in self.message_handlers:
-                # 调用注册的处理器
-                handler = self.message_handlers[message_type]
-                if asyncio.iscoroutinefunction(handler):
-                    await handler(data)
-                else:
-                    handler(data)
-            elif self.default_message_handler:
-                # 调用默认处理器
-                if asyncio.iscoroutinefunction(self.default_message_handler):
-                    await self.default_message_handler(data)
-                else:
-                    self.default_message_handler(data)
-            else:
-                # 默认处理逻辑
-                if data.get("status") == "ready":
-                    await self.send_message({"action": "play_video"})
+            await self._dispatch_message(data)
         except json.JSONDecodeError:
             logger.warning(f"非JSON格式消息: {message[:100]}")
         except Exception as e:
             logger.error(f"处理消息时出错: {str(e)}")
 
+    async def _dispatch_message(self, data: Dict[str, Any]):
+        """
+        根据消息类型调用对应的处理器
+
+        Args:
+            data: 解码后的消息
+        """
+        message_type = data.get("type") or data.get("action") or data.get("status")
+
+        if message_type and message_type in self.message_handlers:
+            # 调用注册的处理器
+            handler = self.message_handlers[message_type]
+            if asyncio.iscoroutinefunction(handler):
+                await handler(data)
+            else:
+                handler(data)
+        elif self.default_message_handler:
+            # 调用默认处理器
+            if asyncio.iscoroutinefunction(self.default_message_handler):
+                await self.default_message_handler(data)
+            else:
+                self.default_message_handler(data)
+        else:
+            # 默认处理逻辑
+            if data.get("status") == "ready":
+                await self.send_message({"action": "play_video"})
+
     def _start_tasks(self):
         """启动所有工作任务"""
         self._cancel_tasks()  # 确保没有运行中的任务
@@ -650,8 +685,8 @@ if __name__ == "__main__":
 
         logger.info(f"WebSocket客户端已启动，按Ctrl+C或输入 exit/quit 退出...")
 
-        # 启动客户端和命令循环
-        asyncio.run(run_with_command())
+        # 启动客户端和命令循环，有uvloop时使用uvloop事件循环
+        asyncio.run(run_with_command(), loop_factory=uvloop_loop_factory(logger))
     except KeyboardInterrupt:
         logger.critical("用户中断，程序退出")
     except Exception as e:
@@ -0,0 +1,31 @@
+"""
+@Project ：Titan
+@File    ：app.py
+@Author  ：PySuper
+@Date    ：2025/5/6 10:20
+@Desc    ：Titan app.py
+"""
+
+from typing import Dict, List, Optional
+
+import tornado.web
+import tornado.websocket
+
+
+class CustomApplication(tornado.web.Application):
+    """
+    自定义Tornado应用程序
+
+    WebSocket连接注册表作为实例属性保存，处理器通过 self.application 直接访问，
+    不再经过 Tornado 内部频繁使用的 settings 字典
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # 客户端ID -> WebSocket处理器
+        self.ws_handler_map: Dict[str, tornado.websocket.WebSocketHandler] = {}
+        # 接收HTTP接口通知的主连接，没有连接时为None
+        self.ws_handler: Optional[tornado.websocket.WebSocketHandler] = None
+        # 所有已建立的WebSocket处理器
+        self.ws_handlers: List[tornado.websocket.WebSocketHandler] = []
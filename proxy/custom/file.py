@@ -8,6 +8,7 @@
 
 import os
 
+import tornado.ioloop
 import tornado.web
 import tornado.websocket
 
@@ -67,7 +68,8 @@ class FileStream(tornado.iostream.IOStream):
         """
         try:
             self.file = open(self.file_path, "rb")
-            self.total_size = os.path.getsize(self.file_path)  # 获取文件大小
+            # 对已打开的文件描述符fstat获取大小，不再按路径重复stat，也避免打开后文件被替换导致大小不一致
+            self.total_size = os.fstat(self.file.fileno()).st_size
             return True
         except IOError as e:
             logger.error(f"打开文件时出错: {str(e)}")
@@ -95,7 +97,8 @@ class FileStream(tornado.iostream.IOStream):
         if not self.file:
             return None
         self.file.seek(self.read_offset)
-        data = self.file.read(self.chunk_size)
+        # 最多读到fstat得到的大小为止，文件在打开后变大时也不会超出Content-Length
+        data = self.file.read(min(self.chunk_size, self.total_size - self.read_offset))
         self.read_offset += len(data)
         return data
 
@@ -131,14 +134,23 @@ class VideoStreamHandler(tornado.web.RequestHandler):
 
         # 设置响应头
         self.set_header("Content-Type", "video/mp4")
+        self.set_header("Content-Length", video_stream.total_size)
         self.set_header("Content-Disposition", f"attachment; filename={os.path.basename(video_path)}")  # 文件名
-        # 开始流式传输
-        while not video_stream.is_eof():
-            data = video_stream.read()
-            if not data:
-                break
-            await self.write(data)
-            await self.flush()
-
-        # 关闭文件
-        video_stream.close()
+
+        # 开始流式传输：磁盘读取放到线程池执行，每块写出后等待flush完成再读下一块，内存中只保留一个分块
+        io_loop = tornado.ioloop.IOLoop.current()
+        sent = 0
+        try:
+            while not video_stream.is_eof():
+                data = await io_loop.run_in_executor(None, video_stream.read)
+                if not data:
+                    # 文件在fstat之后被截断，响应体已无法达到Content-Length，直接中断连接而不是正常结束
+                    logger.warning("视频文件提前结束: {}，已发送 {}/{} 字节", video_path, sent, video_stream.total_size)
+                    self.request.connection.close()
+                    return
+                self.write(data)
+                sent += len(data)
+                await self.flush()
+        finally:
+            # 关闭文件
+            video_stream.close()
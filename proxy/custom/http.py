@@ -7,15 +7,20 @@
 """
 
 import datetime
-import json
+import os
+import re
+import secrets
+import time
 import traceback
 import uuid
 from contextvars import ContextVar
 from dataclasses import dataclass
-from functools import wraps
+from functools import lru_cache, wraps
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+import orjson
+import tornado.ioloop
 import tornado.web
 import tornado.websocket
 
@@ -66,20 +71,99 @@ class SavedFile:
     unique_id: str  # 唯一ID
 
 
-class JSONEncoder(json.JSONEncoder):
-    """扩展的JSON编码器，支持更多Python类型"""
+# 上传文件名中允许保留的字符之外的字符统一替换为下划线（保留中文等Unicode字母）
+_SAFE_NAME = re.compile(r"[^\w.-]")
+# 清洗后文件名的最大长度
+_MAX_NAME_LENGTH = 128
 
-    def default(self, obj):
-        """
-        扩展JSON编码器的默认行为，支持更多Python类型
-        :param obj: 要编码的对象
-        :return: 编码后的对象
-        """
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        if hasattr(obj, "__dict__"):
-            return obj.__dict__
-        return super().default(obj)
+
+def _safe_filename(filename: str) -> str:
+    """
+    清洗客户端上传的文件名，去掉目录部分并替换不安全字符，防止路径穿越
+    :param filename: 原始文件名
+    :return: 可安全拼接到上传目录下的文件名
+    """
+    # 兼容Windows客户端的反斜杠路径
+    name = os.path.basename(filename.replace("\\", "/"))
+    name = _SAFE_NAME.sub("_", name)[:_MAX_NAME_LENGTH]
+    return name or "file"
+
+
+def _write_new_file(file_path: Path, content: bytes) -> None:
+    """
+    以O_EXCL方式创建并写入文件，文件已存在时抛出FileExistsError，不会覆盖
+    直接对fd调用os.write，通过memoryview切片处理部分写入，不经过缓冲文件对象，也不复制上传内容
+    """
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o640)
+    try:
+        view = memoryview(content)
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
+
+
+def _write_new_files(upload_path: Path, files: List[Tuple[Path, bytes]]) -> List[Optional[OSError]]:
+    """
+    在线程池中一次性完成上传目录创建和整批文件写入
+    :param upload_path: 上传目录
+    :param files: (文件路径, 文件内容) 列表
+    :return: 与files一一对应的写入错误，成功为None
+    """
+    upload_path.mkdir(parents=True, exist_ok=True)
+
+    errors: List[Optional[OSError]] = []
+    for file_path, content in files:
+        try:
+            _write_new_file(file_path, content)
+            errors.append(None)
+        except OSError as e:
+            errors.append(e)
+    return errors
+
+
+@lru_cache(maxsize=64)
+def _compose_allow_headers(allowed_headers: str, extra_headers: str) -> str:
+    """
+    拼接允许的请求头；浏览器预检携带的额外请求头组合有限，缓存拼接结果避免每次请求重新分配字符串
+    :param allowed_headers: 默认允许的请求头
+    :param extra_headers: 预检请求中的Access-Control-Request-Headers
+    :return: Access-Control-Allow-Headers的值
+    """
+    return f"{allowed_headers}, {extra_headers}" if extra_headers else allowed_headers
+
+
+def _json_default(obj):
+    """
+    orjson无法直接序列化的类型的回调（datetime、dataclass、Enum由orjson原生支持）
+    :param obj: 要编码的对象
+    :return: 编码后的对象
+    """
+    if hasattr(obj, "__dict__"):
+        return obj.__dict__
+    raise TypeError(f"无法序列化的类型: {type(obj).__name__}")
+
+
+def handle_exception(func):
+    """
+    异常处理装饰器，在类定义时装饰请求处理协程，捕获异常并返回500错误响应
+
+    :param func: 要装饰的协程方法
+    :return: 装饰后的方法
+    """
+
+    @wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        try:
+            return await func(self, *args, **kwargs)
+        except Exception as e:
+            error_msg = f"处理请求时发生错误: {str(e)}"
+            logger.error(error_msg)
+            logger.debug(traceback.format_exc())
+            self.http_err(error_msg, 500)
+            return None
+
+    return wrapper
 
 
 class CustomHttp(tornado.web.RequestHandler):
@@ -96,6 +180,22 @@ class CustomHttp(tornado.web.RequestHandler):
     - 异常处理
     """
 
+    # 固定不变的跨域和安全相关响应头，类加载时构建一次，子类可覆盖
+    DEFAULT_HEADERS = (
+        ("Access-Control-Allow-Methods", "GET, POST, PUT, DELETE, OPTIONS"),
+        ("Access-Control-Allow-Credentials", "true"),
+        ("Access-Control-Max-Age", "3600"),  # 预检请求缓存时间
+        ("X-XSS-Protection", "1; mode=block"),
+        ("X-Content-Type-Options", "nosniff"),
+        ("X-Frame-Options", "SAMEORIGIN"),
+        ("Content-Security-Policy", "default-src * 'self' 'unsafe-inline' 'unsafe-eval' data: blob:"),
+    )
+
+    # 默认允许的请求头
+    ALLOWED_HEADERS = (
+        "Content-Type, Content-Length, Authorization, Accept, X-Requested-With, X-File-Name, Cache-Control, devicetype"
+    )
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -103,6 +203,7 @@ class CustomHttp(tornado.web.RequestHandler):
         self.client_ip = self.request.remote_ip
         self.start_time = datetime.datetime.now()
         self._request_id = str(uuid.uuid4())
+        self._parsed_body: Dict[str, Any] = {}
 
         # 设置请求ID上下文
         request_id_var.set(self._request_id)
@@ -111,11 +212,36 @@ class CustomHttp(tornado.web.RequestHandler):
         global logger
         logger = logger.bind(request_id=self._request_id)
 
-        # 设置默认HTTP响应头
-        self.set_default_headers()
+        # 默认HTTP响应头已由RequestHandler.__init__中的clear()设置，无需重复设置
 
         # 记录请求日志
-        logger.debug(f"收到请求==> 来自 {self.client_ip} - {self.request.method} {self.request.uri}")
+        logger.debug("收到请求==> 来自 {} - {} {}", self.client_ip, self.request.method, self.request.uri)
+
+    def prepare(self) -> None:
+        """
+        在进入具体的请求方法前解析一次JSON请求体，结果缓存在_parsed_body中
+        GET请求没有请求体，直接跳过；multipart文件上传和普通表单由Tornado解析，不做多余的JSON解析。
+        curl -d、Tornado HTTPClient等未指定Content-Type时默认发送form类型，
+        因此非JSON类型的请求体只有以"{"开头时才按JSON解析
+        :return: None
+        """
+        body = self.request.body
+        if self.request.method == "GET" or not body:
+            return
+
+        content_type = self.request.headers.get("Content-Type", "").lower()
+        if not content_type.startswith("application/json"):
+            if content_type.startswith("multipart/") or body[:64].lstrip()[:1] != b"{":
+                return
+
+        try:
+            request_data = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            logger.debug("无法解析请求体为JSON [{}]，尝试从form数据获取参数", self._request_id)
+            return
+
+        if isinstance(request_data, dict):
+            self._parsed_body = request_data
 
     def http_err(self, msg: str, status_code: int = 400) -> None:
         """
@@ -125,9 +251,9 @@ class CustomHttp(tornado.web.RequestHandler):
         :param status_code: HTTP状态码，默认为400
         :return: None
         """
-        logger.error(f"HTTP错误 [{self._request_id}]: {msg}")
+        logger.error("HTTP错误 [{}]: {}", self._request_id, msg)
         self.set_status(status_code)
-        self.write({"status": ResponseStatus.ERROR, "message": msg, "request_id": self._request_id})
+        self._buffer_response({"status": ResponseStatus.ERROR, "message": msg, "request_id": self._request_id})
         return None
 
     def http_success(self, data: Any = None, message: str = "操作成功") -> None:
@@ -142,9 +268,37 @@ class CustomHttp(tornado.web.RequestHandler):
         if data is not None:
             response["data"] = data
 
-        self.write(response)
+        self._buffer_response(response)
         return None
 
+    def _buffer_response(self, response: Dict[str, Any]) -> None:
+        """
+        将响应体序列化后追加到待发送缓冲区，在finish时一次性写出
+
+        :param response: 响应数据
+        :return: None
+        """
+        self._pending.append(orjson.dumps(response, default=_json_default, option=orjson.OPT_NON_STR_KEYS))
+
+    def clear(self) -> None:
+        """
+        重置响应状态，同时清空待发送缓冲区（send_error等场景会先调用clear）
+        :return: None
+        """
+        super().clear()
+        self._pending: List[bytes] = []
+
+    def finish(self, chunk: Any = None):
+        """
+        结束请求前，将缓冲的响应体合并为一次write，避免多次小块写入
+        """
+        if self._pending:
+            # 通常只有一段响应体，直接写出编码结果，避免再拷贝一次
+            pending = self._pending
+            self.write(pending[0] if len(pending) == 1 else b"".join(pending))
+            pending.clear()
+        return super().finish(chunk)
+
     def ws_err(self, msg: str) -> None:
         """
         返回WebSocket错误响应
@@ -152,8 +306,8 @@ class CustomHttp(tornado.web.RequestHandler):
         :param msg: 错误信息
         :return: None
         """
-        logger.error(f"WebSocket错误 [{self._request_id}]: {msg}")
-        self.write({"status": "error", "message": msg, "request_id": self._request_id})
+        logger.error("WebSocket错误 [{}]: {}", self._request_id, msg)
+        self._buffer_response({"status": "error", "message": msg, "request_id": self._request_id})
         return None
 
     def set_default_headers(self) -> None:
@@ -162,29 +316,21 @@ class CustomHttp(tornado.web.RequestHandler):
         :return: None
         """
         super().set_default_headers()
+        request_headers = self.request.headers
+
+        # 跨域相关设置（取自请求头的值仍经过set_header校验，防止响应头注入）
+        self.set_header("Access-Control-Allow-Origin", request_headers.get("Origin", "*"))
 
-        # 跨域相关设置
-        origin = self.request.headers.get("Origin", "*")
-        self.set_header("Access-Control-Allow-Origin", origin)
-        self.set_header("Access-Control-Allow-Methods", "GET, POST, PUT, DELETE, OPTIONS")
-        self.set_header("Access-Control-Allow-Credentials", "true")
-        self.set_header("Access-Control-Max-Age", "3600")  # 预检请求缓存时间
-
-        # 合并请求头
-        default_headers = "Content-Type, Content-Length, Authorization, Accept, X-Requested-With, X-File-Name, Cache-Control, devicetype"
-        request_headers = self.request.headers.get("Access-Control-Request-Headers", "")
-        allowed_headers = default_headers + (f", {request_headers}" if request_headers else "")
-        self.set_header("Access-Control-Allow-Headers", allowed_headers)
-
-        # 安全相关设置
-        self.set_header("X-XSS-Protection", "1; mode=block")
-        self.set_header("X-Content-Type-Options", "nosniff")
-        self.set_header("X-Frame-Options", "SAMEORIGIN")
-        self.set_header("Content-Security-Policy", "default-src * 'self' 'unsafe-inline' 'unsafe-eval' data: blob:")
+        # 固定的跨域和安全相关响应头都是ASCII常量，无需set_header逐个校验，一次性批量写入
+        self._headers.update(self.DEFAULT_HEADERS)
+
+        # 合并请求头，只有预检请求携带额外请求头时才需要拼接，拼接结果按组合缓存
+        extra_headers = request_headers.get("Access-Control-Request-Headers", "")
+        self.set_header("Access-Control-Allow-Headers", _compose_allow_headers(self.ALLOWED_HEADERS, extra_headers))
 
         # 内容类型设置
         content_type = "text/plain" if self.request.method == "OPTIONS" else "application/json; charset=UTF-8"
-        self.set_header("Content-Type", content_type)
+        self._headers["Content-Type"] = content_type
 
     def options(self, *args, **kwargs) -> None:
         """
@@ -200,53 +346,55 @@ class CustomHttp(tornado.web.RequestHandler):
 
         :return: WebSocket处理器实例或None
         """
-        ws_handler_map = self.application.settings.setdefault("ws_handler_map", {})
-        return ws_handler_map.get("websocket_id")
+        return self.application.ws_handler
 
-    def save(self, files: List[Dict[str, Any]]) -> List[SavedFile]:
+    async def save(self, files: List[Dict[str, Any]]) -> List[SavedFile]:
         """
-        保存上传的文件
+        保存上传的文件，目录创建和整批磁盘写入在一次线程池调用中完成，不阻塞IOLoop
         :param files: 上传的文件列表
         :return: 保存的文件信息列表
         """
         saved_files = []
-
-        # 确保上传目录存在
         upload_path = Path(UPLOAD_DIR)
-        upload_path.mkdir(parents=True, exist_ok=True)
 
+        # 同一批次文件共用上传时间，只格式化一次
+        upload_time = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+
+        pending: List[Tuple[SavedFile, bytes]] = []
         for file_data in files:
             original_filename = file_data["filename"]
             file_content = file_data["body"]
-            content_type = file_data["content_type"]
-
-            timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
-            unique_id = str(uuid.uuid4())[:8]
-            filename = f"{timestamp}_{unique_id}_{original_filename}"
-            file_path = upload_path / filename
-
-            try:
-                file_path.write_bytes(file_content)
-
-                file_info = SavedFile(
-                    original_name=original_filename,
-                    saved_name=filename,
-                    file_path=str(file_path),
-                    file_size=len(file_content),
-                    content_type=content_type,
-                    upload_time=timestamp,
-                    unique_id=unique_id,
-                )
+
+            # 微秒时间戳(十六进制) + 随机串，避免每个文件的strftime和uuid4开销
+            unique_id = secrets.token_hex(4)
+            filename = f"{time.time_ns() // 1000:x}_{unique_id}_{_safe_filename(original_filename)}"
+            file_info = SavedFile(
+                original_name=original_filename,
+                saved_name=filename,
+                file_path=str(upload_path / filename),
+                file_size=len(file_content),
+                content_type=file_data["content_type"],
+                upload_time=upload_time,
+                unique_id=unique_id,
+            )
+            pending.append((file_info, file_content))
+
+        # 整批文件在一次线程池调用中写入，只切换一次线程
+        errors = await tornado.ioloop.IOLoop.current().run_in_executor(
+            None, _write_new_files, upload_path, [(Path(info.file_path), body) for info, body in pending]
+        )
+
+        for (file_info, _), error in zip(pending, errors):
+            if error is None:
                 saved_files.append(file_info)
-                logger.info(f"文件已保存: {file_path}")
-            except IOError as e:
-                error_msg = f"保存文件 {original_filename} 时出错: {str(e)}"
-                logger.error(error_msg)
-                logger.debug(traceback.format_exc())
+                logger.info("文件已保存: {}", file_info.file_path)
+            else:
+                logger.error("保存文件 {} 时出错: {}", file_info.original_name, error)
+                logger.debug("".join(traceback.format_exception(error)))
 
         return saved_files
 
-    def notify_ws(self, data: Dict[str, Any]) -> bool:
+    async def notify_ws(self, data: Dict[str, Any]) -> bool:
         """
         向WebSocket客户端发送通知
         :param data: 通知数据
@@ -258,20 +406,18 @@ class CustomHttp(tornado.web.RequestHandler):
                 # 添加时间戳和请求ID
                 data.update({"timestamp": datetime.datetime.now().isoformat(), "request_id": self._request_id})
 
-                # 使用自定义编码器
-                json_data = json.dumps(data, ensure_ascii=False, cls=JSONEncoder)
-
-                if ws.send_message(json_data):
-                    logger.debug(f"通知WebSocket客户端成功: {self._request_id}")
+                # 加入WebSocket的通知队列，由其发送协程合并发送
+                if await ws.queue_notification(data):
+                    logger.debug("通知WebSocket客户端成功: {}", self._request_id)
                     return True
                 else:
-                    logger.warning(f"通知WebSocket客户端失败: {self._request_id}")
+                    logger.warning("通知WebSocket客户端失败: {}", self._request_id)
                     return False
             else:
                 logger.warning("未找到WebSocket连接")
                 return False
         except Exception as e:
-            logger.error(f"通知WebSocket客户端时出错: {str(e)}")
+            logger.error("通知WebSocket客户端时出错: {}", e)
             logger.debug(traceback.format_exc())
             return False
 
@@ -281,16 +427,8 @@ class CustomHttp(tornado.web.RequestHandler):
 
         :return: 参数字典
         """
-        params = {}
-
-        # 尝试解析JSON请求体
-        if self.request.body:
-            try:
-                request_data = json.loads(self.request.body)
-                if isinstance(request_data, dict):
-                    params.update(request_data)
-            except json.JSONDecodeError:
-                logger.warning(f"无法解析请求体为JSON [{self._request_id}]，尝试从form数据获取参数")
+        # 使用prepare中已解析的JSON请求体
+        params = dict(self._parsed_body)
 
         # 获取URL查询参数
         for name, values in self.request.arguments.items():
@@ -306,7 +444,7 @@ class CustomHttp(tornado.web.RequestHandler):
                 if value:
                     params[field_name] = value
 
-        logger.debug(f"提取的参数: {params}")
+        logger.debug("提取的参数: {}", params)
         return params
 
     def validate_params(self, required_params: List[str]) -> Optional[Dict[str, Any]]:
@@ -325,27 +463,6 @@ class CustomHttp(tornado.web.RequestHandler):
 
         return params
 
-    def handle_exception(self, func):
-        """
-        异常处理装饰器
-
-        :param func: 要装饰的函数
-        :return: 装饰后的函数
-        """
-
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            try:
-                return func(*args, **kwargs)
-            except Exception as e:
-                error_msg = f"处理请求时发生错误: {str(e)}"
-                logger.error(error_msg)
-                logger.debug(traceback.format_exc())
-                self.http_err(error_msg, 500)
-                return None
-
-        return wrapper
-
     @property
     def request_id(self) -> str:
         """获取当前请求ID"""
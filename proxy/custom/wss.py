@@ -9,9 +9,12 @@
 import asyncio
 import datetime
 import json
+import time
 import uuid
-from typing import Dict, Any
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
 
+import msgpack
+import orjson
 import tornado.web
 import tornado.websocket
 
@@ -40,15 +43,44 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
         "event": "_handle_event",
         "command": "_handle_command",
         "ping": "_handle_ping",
+        "negotiate": "_handle_negotiate",
     }
 
+    # action字段到消息类型的映射（兼容只带action字段的消息）
+    ACTION_TYPES = {
+        "heartbeat": "ping",
+        "auth": "auth",
+        "message": "message",
+        "command": "command",
+        "event": "event",
+        "negotiate": "negotiate",
+    }
+
+    # 通知支持的编码格式
+    CODECS = ("json", "msgpack")
+
+    # 通知队列容量，客户端消费过慢时让HTTP通知方等待（背压）而不是无限积压
+    NOTIFY_QUEUE_SIZE = 64
+    # 通知入队最长等待时间(秒)，超时视为通知失败
+    NOTIFY_PUT_TIMEOUT = 5.0
+    # 接收队列容量，队满时暂停读取下一帧，把背压传递到客户端的TCP窗口
+    MESSAGE_QUEUE_SIZE = 512
+    # 发送队列容量，由单个写协程等待flush后再发下一条；队满说明客户端接收过慢，关闭该连接，
+    # 客户端重连后会重新收到完整状态，不会因丢弃状态消息而长期不同步
+    OUTBOUND_QUEUE_SIZE = 256
+    # 发送队列溢出时的关闭码(1013: Try Again Later)
+    SLOW_CLIENT_CLOSE_CODE = 1013
+
     # 状态响应类型
     STATUS_TYPES = ["success", "error", "warning", "info", "received"]
 
     def __init__(self, application, request, *args, **kwargs):
-        """初始化WebSocket连接处理器"""
-        super().__init__(application, request)
+        """
+        初始化WebSocket连接处理器
 
+        先设置所有属性的默认值，再调用父类构造方法（其中会调用initialize()），
+        保证initialize()中根据连接设置的值不会被默认值覆盖，且属性始终存在，无需hasattr判断
+        """
         # 连接标识和会话信息
         self.client_id: str = ""
         self._request_id: str = str(uuid.uuid4())
@@ -64,29 +96,48 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
         self.message_count: int = 0
 
         # 消息处理队列
-        self.message_queue: asyncio.Queue = asyncio.Queue()
+        self.message_queue: asyncio.Queue = asyncio.Queue(maxsize=self.MESSAGE_QUEUE_SIZE)
         self.is_processing_queue: bool = False
+        self.queue_task: asyncio.Task = ""
+
+        # 通知发送队列（HTTP -> WebSocket），由单个协程合并发送
+        self.notify_queue: asyncio.Queue = asyncio.Queue(maxsize=self.NOTIFY_QUEUE_SIZE)
+        self.notify_task: asyncio.Task = ""
+        self.notify_binary: bool = False
+
+        # 发送队列（(已编码的bytes, 是否二进制帧)），所有发送都经过它，由单个写协程按入队顺序发送
+        self.outbound_queue: asyncio.Queue = asyncio.Queue(maxsize=self.OUTBOUND_QUEUE_SIZE)
+        self.outbound_task: asyncio.Task = ""
 
         # 心跳检测
+        self.heartbeat_enabled: bool = False
         self._ping_interval: int = 30
         self._ping_timeout: int = 60
-        self.last_pong: datetime.datetime = datetime.datetime.now()
+        self.last_pong: float = time.monotonic()  # 单调时钟，仅用于计算间隔
         self.heartbeat_future: asyncio.Task = ""
 
         # 任务控制
         self.frame_task: asyncio.Task = ""
+        self.shutdown_task: asyncio.Task = ""  # 单连接模式下释放被替换旧连接的任务
         self.stop_tasks: bool = False
         self.is_paused: bool = True
 
         # 连接模式 (True: 允许多连接, False: 单连接模式)
         self.holdon: bool = True
 
+        # 消息类型到绑定处理方法的映射，每个连接只构建一次
+        self._message_handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]] = {
+            msg_type: getattr(self, handler_name)
+            for msg_type, handler_name in self.MESSAGE_TYPES.items()
+            if hasattr(self, handler_name)
+        }
+
+        super().__init__(application, request, **kwargs)
+
     def initialize(self, *args, **kwargs):
         """初始化连接配置和状态"""
         # 注册到WebSocket处理器集合
-        if "ws_handlers" not in self.application.settings:
-            self.application.settings["ws_handlers"] = []
-        self.application.settings["ws_handlers"].append(self)
+        self.application.ws_handlers.append(self)
 
         # 设置连接模式
         self.holdon = kwargs.get("holdon", True)  # 默认为允许多连接
@@ -99,7 +150,7 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
         self.heartbeat_enabled = kwargs.get("heartbeat_enabled", False)  # 是否启用心跳检测
         self._ping_interval = kwargs.get("ping_interval", 30)  # 心跳检测间隔
         self._ping_timeout = kwargs.get("ping_timeout", 60)  # 心跳检测超时
-        self.last_pong = datetime.datetime.now()  # 最后一次收到心跳回复的时间
+        self.last_pong = time.monotonic()  # 最后一次收到心跳回复的时间
 
         # 初始化任务控制状态
         self.stop_tasks = False  # 任务停止标志
@@ -127,6 +178,9 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
     # 连接建立事件
     def open(self):
         """处理WebSocket连接建立事件"""
+        # 关闭Nagle算法，避免小消息被合并延迟发送
+        self.set_nodelay(True)
+
         # 根据连接模式处理连接
         self._handle_multi_connection() if self.holdon else self._handle_single_connection()
 
@@ -135,7 +189,14 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
             self._start_heartbeat()
 
         # 启动消息队列处理
-        asyncio.create_task(self._process_message_queue())
+        self.queue_task = asyncio.create_task(self._process_message_queue())
+
+        # 启动通知队列发送，客户端通过 ?format=msgpack 声明支持MessagePack时以二进制帧发送
+        self.notify_binary = self.get_argument("format", "") == "msgpack"
+        self.notify_task = asyncio.create_task(self._drain_notify_queue())
+
+        # 启动发送队列写协程
+        self.outbound_task = asyncio.create_task(self._write_outbound_queue())
         # logger.debug(f"ws连接初始化: [ID: {self.client_id}]")
 
     # 处理多连接模式 - 保留所有连接
@@ -145,30 +206,26 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
         self.client_id = str(uuid.uuid4())
 
         # 注册连接到连接映射表
-        ws_map = self.application.settings.setdefault("ws_handler_map", {})
+        ws_map = self.application.ws_handler_map
         ws_map[self.client_id] = self
 
-        # 保持向后兼容
-        if "websocket_id" not in ws_map:
-            ws_map["websocket_id"] = self
+        # 没有主连接时，第一个连接作为HTTP接口通知的主连接
+        if self.application.ws_handler is None:
+            self.application.ws_handler = self
 
-        # 活跃连接数 (减1是因为包含websocket_id键)
-        active_connections = len(ws_map) - 1
+        active_connections = len(ws_map)
         logger.info(f"ws新客户端: ID={self.client_id}, 当前连接数={active_connections}")
 
     # 处理单连接模式 - 保留最新连接
     def _handle_single_connection(self):
         """处理单连接模式 - 保留最新连接"""
         try:
-            # 获取连接映射表
-            ws_map = self.application.settings.setdefault("ws_handler_map", {})
-
             # 关闭已存在的连接
-            self._close_existing_connection(ws_map)
+            self._close_existing_connection()
 
-            # 建立新连接
+            # 建立新连接，作为HTTP接口通知的主连接
             self.client_id = str(uuid.uuid4())
-            ws_map["websocket_id"] = self
+            self.application.ws_handler = self
 
             # 记录连接信息
             client_info = {
@@ -193,9 +250,9 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
             self.close(code=1011, reason="连接初始化失败")
 
     # 关闭已存在的连接
-    def _close_existing_connection(self, ws_map):
+    def _close_existing_connection(self):
         """关闭已存在的连接"""
-        old_handler = ws_map.get("websocket_id")
+        old_handler = self.application.ws_handler
         if not old_handler:
             return
 
@@ -205,11 +262,11 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
             old_handler.stop_tasks = True
 
             # 取消帧任务
-            if hasattr(old_handler, "frame_task") and old_handler.frame_task:
+            if old_handler.frame_task:
                 old_handler.frame_task.cancel()
 
             # 取消心跳任务
-            if hasattr(old_handler, "heartbeat_future") and old_handler.heartbeat_future:
+            if old_handler.heartbeat_future:
                 old_handler.heartbeat_future.cancel()
 
             # 发送关闭通知
@@ -218,16 +275,57 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
                 "reason": "新的客户端连接已建立，旧连接已关闭",
                 "server_time": datetime.datetime.now().isoformat(),
             }
-            old_handler.write_message(json.dumps(close_msg, ensure_ascii=False))
+            # 旧连接随即关闭，其发送队列会被丢弃，这是唯一绕过发送队列直接写socket的地方
+            old_handler.write_message(orjson.dumps(close_msg))
 
             # 关闭连接
             old_handler.close(code=1000, reason="新的客户端连接已建立，旧连接已关闭")
 
+            # 异步等待旧连接的任务真正结束并释放其状态；保留任务引用，防止执行中被垃圾回收
+            self.shutdown_task = asyncio.create_task(self._shutdown_old(old_handler))
+            self.shutdown_task.add_done_callback(self._log_shutdown_result)
+
         except Exception as e:
             logger.warning(f"关闭旧连接时出错: {str(e)}")
 
+    @staticmethod
+    def _log_shutdown_result(task: asyncio.Task):
+        """记录释放旧连接任务的异常，避免异常被静默丢弃"""
+        if not task.cancelled() and task.exception() is not None:
+            logger.opt(exception=task.exception()).error("释放旧连接状态时出错")
+
+    async def _shutdown_old(self, old_handler: "CustomWebSocket"):
+        """等待旧连接的后台任务取消完成，清空其队列并从处理器列表中移除"""
+        tasks = [
+            task
+            for task in (
+                old_handler.frame_task,
+                old_handler.heartbeat_future,
+                old_handler.queue_task,
+                old_handler.notify_task,
+                old_handler.outbound_task,
+            )
+            if task and not task.done()
+        ]
+        for task in tasks:
+            task.cancel()
+        # return_exceptions=True 吞掉 CancelledError
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        old_handler._clear_message_queue()
+        while not old_handler.notify_queue.empty():
+            old_handler.notify_queue.get_nowait()
+        while not old_handler.outbound_queue.empty():
+            old_handler.outbound_queue.get_nowait()
+
+        handlers = self.application.ws_handlers
+        if old_handler in handlers:
+            handlers.remove(old_handler)
+
+        logger.debug(f"旧连接状态已释放: ID={old_handler.client_id}")
+
     # 接收处理WebSocket消息
-    def on_message(self, message: str):
+    def on_message(self, message: Union[str, bytes]):
         """处理接收到的WebSocket消息"""
         # 消息为空检查
         if not message:
@@ -236,32 +334,47 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
         try:
             # 更新统计信息
             self.message_count += 1
-            self.bytes_received += len(message) if hasattr(message, "__len__") else 0
-            self.last_pong = datetime.datetime.now()
+            self.bytes_received += len(message)
+            self.last_pong = time.monotonic()
 
             # 解析消息
-            data = tornado.escape.json_decode(message)
+            data = orjson.loads(message)
             if not isinstance(data, dict):
                 return self._send_error("无效的消息格式")
 
             # 记录消息
-            logger.debug(f"收到消息: {json.dumps(data, ensure_ascii=False)}")
+            # 每条消息都会经过这里，使用惰性求值，DEBUG级别未开启时不做序列化
+            logger.opt(lazy=True).debug("收到消息: {}", lambda: json.dumps(data, ensure_ascii=False))
 
             # 处理心跳消息
             if data.get("type") == "ping" or data.get("action") == "heartbeat":
                 return self._handle_ping(data)
 
-            # 将消息加入队列异步处理
-            asyncio.create_task(self.message_queue.put(data))
-            return None
+            # 将消息加入队列异步处理（不为每条消息创建任务）
+            return self._enqueue_received(data)
 
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             logger.error("接收到无效的JSON格式消息")
             return self._send_error("无效的JSON格式")
         except Exception as e:
             logger.error(f"处理消息时出错: {str(e)}", exc_info=True)
             return self._send_error(f"处理消息时出错: {str(e)}")
 
+    # 将收到的消息加入接收队列
+    def _enqueue_received(self, data: Dict[str, Any]) -> Optional[Awaitable[None]]:
+        """
+        将收到的消息加入接收队列
+
+        队列未满时直接入队并返回None；队列已满时返回put协程，on_message将其返回给Tornado，
+        Tornado在其完成前不会读取下一帧，背压由此传递到客户端的TCP窗口
+        """
+        try:
+            self.message_queue.put_nowait(data)
+        except asyncio.QueueFull:
+            logger.warning(f"接收队列已满，暂停读取客户端 {self.client_id} 的消息")
+            return self.message_queue.put(data)
+        return None
+
     # TODO：处理消息队列
     async def _process_message_queue(self):
         """处理消息队列"""
@@ -270,12 +383,14 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
 
         self.is_processing_queue = True
         log = logger.bind(request_id=self._request_id)  # 使用绑定了request_id的logger
+        # 循环内不变的属性和方法绑定为局部变量；stop_tasks/ws_connection 会被其他协程修改，每轮重新读取
+        queue = self.message_queue
+        process = self._process_message
         try:
             while not self.stop_tasks:
+                # 阻塞等待新消息，连接关闭时由 on_close 取消本任务
+                data = await queue.get()
                 try:
-                    # 等待新消息，超时1秒
-                    data = await asyncio.wait_for(self.message_queue.get(), timeout=1.0)
-
                     # 检查连接状态
                     if not self.ws_connection:
                         log.warning("WebSocket连接已关闭，停止处理消息队列")
@@ -283,24 +398,75 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
 
                     # 处理消息
                     if data is not None:
-                        await self._process_message(data)
-
-                    # 标记任务完成
-                    self.message_queue.task_done()
-
-                except asyncio.TimeoutError:
-                    # 超时，继续下一次循环
-                    continue
+                        await process(data)
                 except Exception as e:
                     log.error(f"处理队列消息时出错: {str(e)}", exc_info=True)
-                    # 尝试标记任务完成
-                    try:
-                        self.message_queue.task_done()
-                    except Exception:
-                        pass
+                finally:
+                    # 标记任务完成
+                    queue.task_done()
+        except asyncio.CancelledError:
+            pass
         finally:
             self.is_processing_queue = False
 
+    # 将通知加入发送队列
+    async def queue_notification(self, data: Dict[str, Any]) -> bool:
+        """
+        将通知加入发送队列，由_drain_notify_queue合并后统一发送
+
+        :param data: 通知数据
+        :return: 是否成功加入队列
+        """
+        if not self.ws_connection:
+            logger.warning("尝试发送通知，但WebSocket连接已关闭")
+            return False
+
+        try:
+            await asyncio.wait_for(self.notify_queue.put(data), timeout=self.NOTIFY_PUT_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"通知队列已满，客户端 {self.client_id} 消费过慢，丢弃通知")
+            return False
+        return True
+
+    # 合并发送通知队列
+    async def _drain_notify_queue(self):
+        """合并发送通知队列：同一轮事件循环内积压的通知合并为一帧发送"""
+        # 队列对象在连接生命周期内不变，绑定为局部变量；notify_binary 可被协商修改，每轮重新读取
+        queue = self.notify_queue
+        while not self.stop_tasks:
+            try:
+                items = [await queue.get()]
+                while not queue.empty():
+                    items.append(queue.get_nowait())
+
+                # 单条通知保持原格式，多条通知合并为batch消息
+                payload = items[0] if len(items) == 1 else {"type": "batch", "items": items}
+                if self.notify_binary:
+                    await self._safe_write_message(msgpack.packb(payload, use_bin_type=True, default=str), binary=True)
+                else:
+                    await self._safe_write_message(orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS))
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"发送通知队列时出错: {str(e)}")
+
+    # 依次发送发送队列中的消息
+    async def _write_outbound_queue(self):
+        """依次发送发送队列中的消息，等待上一条写入完成后再发下一条"""
+        queue = self.outbound_queue
+        while not self.stop_tasks:
+            message, binary = await queue.get()
+            try:
+                self.bytes_sent += len(message)
+                await self.write_message(message, binary=binary)
+            except tornado.websocket.WebSocketClosedError:
+                logger.warning("WebSocket连接已关闭，停止发送队列")
+                break
+            except Exception as e:
+                logger.error(f"发送队列消息时出错: {str(e)}")
+            finally:
+                queue.task_done()
+
     # 处理单条消息
     async def _process_message(self, data: Dict[str, Any]):
         """处理单条消息"""
@@ -312,14 +478,7 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
 
             # 处理action字段（兼容不同格式的消息）
             if "action" in data and "type" not in data:
-                action_type_map = {
-                    "heartbeat": "ping",
-                    "auth": "auth",
-                    "message": "message",
-                    "command": "command",
-                    "event": "event",
-                }
-                data["type"] = action_type_map.get(data["action"], data["action"])
+                data["type"] = self.ACTION_TYPES.get(data["action"], data["action"])
 
             # 确保消息类型存在
             msg_type = data.get("type")
@@ -337,15 +496,20 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
                 await self._handle_ping(data)
                 return
 
+            # 编码协商属于握手过程，无需身份验证
+            if msg_type == "negotiate":
+                await self._handle_negotiate(data)
+                return
+
             # 其他消息类型需要身份验证
             if not self.is_authenticated and msg_type not in ["ping"]:
                 await self._send_response("error", "请先进行身份验证", type="auth_required")
                 return
 
             # 根据类型分发处理
-            handler_name = self.MESSAGE_TYPES.get(msg_type)
-            if handler_name and hasattr(self, handler_name):
-                await getattr(self, handler_name)(data)
+            handler = self._message_handlers.get(msg_type)
+            if handler:
+                await handler(data)
             else:
                 logger.warning(f"未知的消息类型: {msg_type}")
                 await self._send_response("warning", f"未知的消息类型: {msg_type}")
@@ -377,6 +541,17 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
             logger.error(f"身份验证处理出错: {str(e)}", exc_info=True)
             await self._send_response("error", f"身份验证处理出错", type="auth_error")
 
+    # 处理编码协商
+    async def _handle_negotiate(self, data: Dict[str, Any]):
+        """处理编码协商，客户端声明支持MessagePack后通知改为二进制帧发送"""
+        codec = data.get("codec", "json")
+        if codec not in self.CODECS:
+            await self._send_response("error", f"不支持的编码格式: {codec}", type="negotiate_failed", codecs=self.CODECS)
+            return
+
+        self.notify_binary = codec == "msgpack"
+        await self._send_response("success", f"通知编码已切换为{codec}", type="negotiated", codec=codec)
+
     # 处理普通消息
     async def _handle_message(self, data: Dict[str, Any]):
         """处理普通消息"""
@@ -411,7 +586,9 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
                 return
 
             # 记录事件
-            logger.info(f"收到事件: {event_name}, 数据: {json.dumps(event_data, ensure_ascii=False)}")
+            logger.opt(lazy=True).debug(
+                "收到事件: {}, 数据: {}", lambda: event_name, lambda: json.dumps(event_data, ensure_ascii=False)
+            )
 
             # 实际项目中可以在这里添加事件处理逻辑
             await self._send_response(
@@ -436,7 +613,9 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
                 return
 
             # 记录命令
-            logger.info(f"执行命令: {command}, 参数: {json.dumps(params, ensure_ascii=False)}")
+            logger.opt(lazy=True).debug(
+                "执行命令: {}, 参数: {}", lambda: command, lambda: json.dumps(params, ensure_ascii=False)
+            )
 
             # 执行命令
             command_result = self._execute_command(command, params)
@@ -488,7 +667,7 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
             "time": datetime.datetime.now().isoformat(),
             "server_id": self._request_id,
         }
-        await self._safe_write_message(json.dumps(pong_data, ensure_ascii=False))
+        await self._safe_write_message(orjson.dumps(pong_data))
         return None
 
     # 启动心跳检测任务
@@ -496,14 +675,16 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
         """启动心跳检测任务"""
 
         async def heartbeat_check():
+            # 按单调时钟截止时间调度，避免每轮发送耗时累积成漂移
+            next_deadline = time.monotonic() + self._ping_interval
             while not self.stop_tasks:
                 try:
                     # 发送ping消息
                     ping_data = {"type": "ping", "time": datetime.datetime.now().isoformat()}
-                    await self._safe_write_message(json.dumps(ping_data, ensure_ascii=False))
+                    await self._safe_write_message(orjson.dumps(ping_data))
 
                     # 检查上次响应时间
-                    elapsed = (datetime.datetime.now() - self.last_pong).total_seconds()
+                    elapsed = time.monotonic() - self.last_pong
 
                     # 超时检测
                     if elapsed > self._ping_timeout:
@@ -511,8 +692,12 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
                         self.close(code=1001, reason="心跳超时")
                         break
 
-                    # 等待下一次心跳
-                    await asyncio.sleep(self._ping_interval)
+                    # 等待到下一次心跳截止时间；落后超过一个周期时直接重新对齐，不补发积压的心跳
+                    now = time.monotonic()
+                    if now > next_deadline + self._ping_interval:
+                        next_deadline = now
+                    await asyncio.sleep(max(0.0, next_deadline - now))
+                    next_deadline += self._ping_interval
                 except asyncio.CancelledError:
                     break
                 except Exception as e:
@@ -525,7 +710,7 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
     async def _broadcast_message(self, content: str, exclude_self: bool = False):
         """广播消息到所有连接"""
         try:
-            handlers = self.application.settings.get("ws_handlers", [])
+            handlers = self.application.ws_handlers
             if not handlers:
                 await self._send_response("warning", "没有可用的WebSocket连接")
                 return
@@ -537,15 +722,15 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
                 "timestamp": datetime.datetime.now().isoformat(),
             }
 
-            message_json = json.dumps(broadcast_data, ensure_ascii=False)
+            message_json = orjson.dumps(broadcast_data)
             sent_count = 0
 
             for handler in handlers:
                 if exclude_self and handler == self:
                     continue
 
-                if getattr(handler, "is_authenticated", False) and handler.ws_connection:
-                    await handler._safe_write_message(message_json)
+                # 同一份bytes直接写给每个连接，不再逐个创建协程
+                if getattr(handler, "is_authenticated", False) and handler.send_message(message_json):
                     sent_count += 1
 
             await self._send_response(
@@ -559,7 +744,7 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
     async def _send_private_message(self, target_id: str, content: str):
         """发送私聊消息"""
         try:
-            ws_map = self.application.settings.get("ws_handler_map", {})
+            ws_map = self.application.ws_handler_map
             target_handler = ws_map.get(target_id)
 
             if not target_handler or not target_handler.ws_connection:
@@ -573,7 +758,7 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
                 "timestamp": datetime.datetime.now().isoformat(),
             }
 
-            await target_handler._safe_write_message(json.dumps(private_data, ensure_ascii=False))
+            await target_handler._safe_write_message(orjson.dumps(private_data))
             await self._send_response("success", "私聊消息已发送", type="message_sent", recipient=target_id)
         except Exception as e:
             logger.error(f"发送私聊消息时出错: {str(e)}", exc_info=True)
@@ -585,7 +770,7 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
         try:
             res = {"status": status, "message": message}
             res.update(kwargs)
-            await self._safe_write_message(json.dumps(res, ensure_ascii=False))
+            await self._safe_write_message(orjson.dumps(res, option=orjson.OPT_NON_STR_KEYS))
         except Exception as e:
             logger.error(f"发送响应时出错: {str(e)}")
 
@@ -599,45 +784,49 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
     def _send_message(self, data: Dict[str, Any]) -> bool:
         """发送消息到WebSocket客户端"""
         try:
-            if not self.ws_connection:
-                logger.warning("尝试发送消息，但WebSocket连接已关闭")
-                return False
+            message = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        except Exception as e:
+            logger.error(f"序列化WebSocket消息时出错: {str(e)}")
+            return False
+        return self.send_message(message)
 
-            message = json.dumps(data, ensure_ascii=False)
+    # 发送已编码的消息
+    def send_message(self, message: bytes, binary: bool = False) -> bool:
+        """
+        发送已编码的消息，所有发送路径最终都经过这里
 
-            # 更新统计信息
-            self.bytes_sent += len(message)
+        消息加入发送队列，由_write_outbound_queue按入队顺序写出，直接回复不会越过已入队的广播；
+        message为已编码的UTF-8 JSON字节时以文本帧发送(binary=False)，Tornado不会再对bytes重复编码；
+        广播时同一份bytes可直接发给所有客户端。
+        发送队列已满时关闭该连接，而不是静默丢弃消息（其中可能有状态变更）
 
-            self.write_message(message)
-            return True
-        except Exception as e:
-            logger.error(f"发送WebSocket消息时出错: {str(e)}")
+        :return: 是否成功加入发送队列
+        """
+        if not self.ws_connection:
+            logger.warning("尝试发送消息，但WebSocket连接已关闭")
             return False
 
+        try:
+            self.outbound_queue.put_nowait((message, binary))
+        except asyncio.QueueFull:
+            logger.warning(f"发送队列已满，客户端 {self.client_id} 接收过慢，关闭连接")
+            self.close(code=self.SLOW_CLIENT_CLOSE_CODE, reason="客户端接收过慢")
+            return False
+        return True
+
     # 异步发送JSON消息
-    def _async_write_message(self, data: Dict[str, Any]):
-        """异步发送JSON消息"""
-        asyncio.create_task(self._safe_write_message(json.dumps(data, ensure_ascii=False)))
+    def _async_write_message(self, data: Dict[str, Any]) -> bool:
+        """异步发送JSON消息，加入发送队列而不是为每条消息创建任务"""
+        return self.send_message(orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS))
 
     # 安全地发送WebSocket消息
-    async def _safe_write_message(self, message: str) -> bool:
-        """安全地发送WebSocket消息"""
-        try:
-            if not self.ws_connection:
-                logger.warning("尝试发送消息，但WebSocket连接已关闭")
-                return False
-
-            # 更新统计信息
-            self.bytes_sent += len(message)
+    async def _safe_write_message(self, message: bytes, binary: bool = False) -> bool:
+        """
+        安全地发送WebSocket消息
 
-            self.write_message(message)
-            return True
-        except tornado.websocket.WebSocketClosedError:
-            logger.warning("WebSocket连接已关闭，无法发送消息")
-            return False
-        except Exception as e:
-            logger.error(f"发送WebSocket消息时出错: {str(e)}")
-            return False
+        message为已编码的UTF-8字节，binary=False时Tornado直接以文本帧发送，不再重复编码
+        """
+        return self.send_message(message, binary=binary)
 
     # 获取连接统计信息
     def get_connection_stats(self) -> Dict[str, Any]:
@@ -653,7 +842,7 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
                     "bytes_received": self.bytes_received,
                     "bytes_sent": self.bytes_sent,
                     "authenticated": self.is_authenticated,
-                    "queue_size": self.message_queue.qsize() if hasattr(self, "message_queue") else 0,
+                    "queue_size": self.message_queue.qsize(),
                 }
 
             uptime = (datetime.datetime.now() - self.connected_at).total_seconds()
@@ -668,14 +857,14 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
                 "bytes_received": self.bytes_received,
                 "bytes_sent": self.bytes_sent,
                 "authenticated": self.is_authenticated,
-                "queue_size": self.message_queue.qsize() if hasattr(self, "message_queue") else 0,
+                "queue_size": self.message_queue.qsize(),
             }
         except Exception as e:
             # 出现异常时返回基本信息
             logger.error(f"获取连接统计信息出错: {str(e)}")
             return {
                 "error": "获取连接统计信息失败",
-                "client_id": getattr(self, "client_id", "未知"),
+                "client_id": self.client_id or "未知",
                 "exception": str(e),
             }
 
@@ -685,15 +874,14 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
         try:
             # 安全地清空队列
             cleared_count = 0
-            if hasattr(self, "message_queue") and self.message_queue:
-                while not self.message_queue.empty():
-                    try:
-                        self.message_queue.get_nowait()
-                        self.message_queue.task_done()
-                        cleared_count += 1
-                    except Exception as e:
-                        logger.warning(f"清空单个消息时出错: {str(e)}")
-                        break
+            while not self.message_queue.empty():
+                try:
+                    self.message_queue.get_nowait()
+                    self.message_queue.task_done()
+                    cleared_count += 1
+                except Exception as e:
+                    logger.warning(f"清空单个消息时出错: {str(e)}")
+                    break
 
             return {"status": "success", "message": "消息队列已清空", "cleared_messages": cleared_count}
         except Exception as e:
@@ -703,48 +891,46 @@ class CustomWebSocket(tornado.websocket.WebSocketHandler):
     # 处理WebSocket连接关闭事件
     def on_close(self):
         """处理WebSocket连接关闭事件"""
-        log = logger.bind(request_id=getattr(self, "_request_id", "unknown"))
+        log = logger.bind(request_id=self._request_id)
 
         try:
             # 停止所有任务
             self.stop_tasks = True
 
             # 取消心跳任务
-            if hasattr(self, "heartbeat_future") and self.heartbeat_future and not self.heartbeat_future.done():
+            if self.heartbeat_future and not self.heartbeat_future.done():
                 self.heartbeat_future.cancel()
 
             # 取消帧任务
-            if hasattr(self, "frame_task") and self.frame_task and not self.frame_task.done():
+            if self.frame_task and not self.frame_task.done():
                 self.frame_task.cancel()
 
+            # 取消消息队列处理任务
+            if self.queue_task and not self.queue_task.done():
+                self.queue_task.cancel()
+
+            # 取消通知发送任务
+            if self.notify_task and not self.notify_task.done():
+                self.notify_task.cancel()
+
+            # 取消发送队列写协程
+            if self.outbound_task and not self.outbound_task.done():
+                self.outbound_task.cancel()
+
             # 清理消息队列
             self._clear_message_queue()
 
-            # 从处理器映射中移除
-            if (
-                hasattr(self, "application")
-                and hasattr(self.application, "settings")
-                and "ws_handler_map" in self.application.settings
-            ):
-                ws_map = self.application.settings["ws_handler_map"]
-
-                # 移除全局映射
-                if ws_map.get("websocket_id") == self:
-                    ws_map.pop("websocket_id", None)
+            # 解除主连接
+            if self.application.ws_handler is self:
+                self.application.ws_handler = None
 
-                # 移除客户端ID映射
-                if hasattr(self, "client_id") and self.client_id in ws_map:
-                    ws_map.pop(self.client_id, None)
+            # 移除客户端ID映射
+            self.application.ws_handler_map.pop(self.client_id, None)
 
             # 从处理器列表中移除
-            if (
-                hasattr(self, "application")
-                and hasattr(self.application, "settings")
-                and "ws_handlers" in self.application.settings
-            ):
-                handlers = self.application.settings["ws_handlers"]
-                if self in handlers:
-                    handlers.remove(self)
+            handlers = self.application.ws_handlers
+            if self in handlers:
+                handlers.remove(self)
 
             # 记录连接统计
             try:
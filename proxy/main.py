@@ -6,18 +6,20 @@
 @Desc    ：Titan main.py
 """
 
+import asyncio
+import functools
 import os
 import signal
 
 import tornado
 import tornado.httpserver
-import tornado.ioloop
 import tornado.netutil
 from tornado.web import StaticFileHandler
 
 from logic.config import get_logger
+from proxy.custom.app import CustomApplication
 from proxy.server import HttpProxy, WsProxy
-from utils.system import close_port
+from utils.system import close_port, uvloop_loop_factory
 
 # 创建一个系统级别的logger
 logger = get_logger("proxy-server")
@@ -78,14 +80,13 @@ def make_app():
         "xsrf_cookies": False,  # 暂时禁用XSRF保护，根据需要启用
         "websocket_ping_interval": 30,  # WebSocket心跳间隔(秒)
         "websocket_ping_timeout": 120,  # WebSocket心跳超时(秒)
-        "ws_handler_map": {},  # WebSocket处理器映射
         "upload_path": upload_path,  # 上传文件保存目录
         "max_buffer_size": 1024 * 1024 * 100,  # 最大缓冲区大小(100MB)
         "max_body_size": 1024 * 1024 * 200,  # 最大请求体大小(200MB)
     }
 
-    # 创建并返回应用程序实例
-    app = tornado.web.Application(handlers, **settings)
+    # 创建并返回应用程序实例，WebSocket连接注册表由CustomApplication作为实例属性维护
+    app = CustomApplication(handlers, **settings)
 
     # 记录应用程序配置信息
     logger.debug(f"Tornado调试模式: {settings['debug']}")
@@ -96,16 +97,47 @@ def make_app():
     return app
 
 
-def handle_signal(sig, frame):
+def handle_signal(loop, stop_event, sig, frame):
     """处理系统信号，优雅关闭服务器"""
     # log = logger.bind(request_id="shutdown")
     logger.info(f"接收到信号 {sig}，服务器正在优雅关闭...")
 
-    # 获取当前的IOLoop实例
-    ioloop = tornado.ioloop.IOLoop.current()
+    # 信号处理函数中通过call_soon_threadsafe安全地唤醒事件循环，结束serve()
+    loop.call_soon_threadsafe(stop_event.set)
 
-    # 使用ioloop.add_callback来安全地停止
-    ioloop.add_callback_from_signal(ioloop.stop)
+
+async def serve():
+    """启动HTTP和WebSocket服务器，收到退出信号后停止"""
+    # 创建应用
+    logger.debug("正在初始化Titan服务器...")
+    app = make_app()
+
+    # 设置HTTP服务器
+    logger.debug("正在启动HTTP服务器...")
+    http_server = tornado.httpserver.HTTPServer(app)
+    http_server.listen(9000, address="0.0.0.0")
+    logger.debug("HTTP      服务器：已启动，监听端口: 9000")
+
+    # 设置WebSocket服务器
+    logger.debug("正在启动WebSocket服务器...")
+    ws_server = tornado.httpserver.HTTPServer(app)
+    ws_server.add_sockets(tornado.netutil.bind_sockets(9001))
+    logger.debug("WebSocket 服务器：已启动，监听端口: 9001")
+
+    # 注册信号处理器
+    stop_event = asyncio.Event()
+    on_signal = functools.partial(handle_signal, asyncio.get_running_loop(), stop_event)
+    signal.signal(signal.SIGINT, on_signal)  # 处理Ctrl+C
+    signal.signal(signal.SIGTERM, on_signal)  # 处理终止信号
+
+    # 启动服务
+    logger.info("✅ Titan服务器启动完成，正在运行...")
+    logger.debug("按Ctrl+C停止服务器")
+
+    # 等待退出信号
+    await stop_event.wait()
+    http_server.stop()
+    ws_server.stop()
 
 
 def main():
@@ -113,38 +145,17 @@ def main():
     # 创建一个带有请求ID的日志记录器
     # log = logger.bind(request_id="server_startup")
 
+    # 有uvloop时由Runner用uvloop创建事件循环，不设置全局事件循环策略
+    loop_factory = uvloop_loop_factory(logger)
+
     # 检查端口占用情况并释放端口
     logger.debug("检查端口占用情况...")
     close_port(9000, logger)
     close_port(9001, logger)
 
     try:
-        # 创建应用
-        logger.debug("正在初始化Titan服务器...")
-        app = make_app()
-
-        # 设置HTTP服务器
-        logger.debug("正在启动HTTP服务器...")
-        http_server = tornado.httpserver.HTTPServer(app)
-        http_server.listen(9000, address="0.0.0.0")
-        logger.debug("HTTP      服务器：已启动，监听端口: 9000")
-
-        # 设置WebSocket服务器
-        logger.debug("正在启动WebSocket服务器...")
-        ws_server = tornado.httpserver.HTTPServer(app)
-        ws_server.add_sockets(tornado.netutil.bind_sockets(9001))
-        logger.debug("WebSocket 服务器：已启动，监听端口: 9001")
-
-        # 注册信号处理器
-        signal.signal(signal.SIGINT, handle_signal)  # 处理Ctrl+C
-        signal.signal(signal.SIGTERM, handle_signal)  # 处理终止信号
-
-        # 启动服务
-        logger.info("✅ Titan服务器启动完成，正在运行...")
-        logger.debug("按Ctrl+C停止服务器")
-
-        # 启动事件循环
-        tornado.ioloop.IOLoop.current().start()
+        # 启动事件循环，直到serve()收到退出信号后返回
+        asyncio.run(serve(), loop_factory=loop_factory)
 
         # 如果到达这里，说明事件循环已停止
         logger.info("Titan服务器已关闭")
@@ -6,9 +6,25 @@
 @Desc    ：Titan http.py
 """
 
-from typing import Any, Dict
+import math
+import sys
+from typing import Any, Dict, Optional
 
-from proxy.custom.http import CustomHttp, logger
+from proxy.custom.http import CustomHttp, handle_exception, logger
+
+
+def _to_finite_float(value: Any) -> Optional[float]:
+    """
+    将参数转换为有限浮点数
+
+    :param value: 参数值
+    :return: 转换后的浮点数，无法转换或为nan/inf时返回None
+    """
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
 
 
 class HttpProxy(CustomHttp):
@@ -17,14 +33,15 @@ class HttpProxy(CustomHttp):
     根据不同的请求方式，接收参数，处理后发送消息给websocket客户端
     """
 
-    def get(self):
+    async def get(self):
         """
         接收到http get请求后，根据请求参数，执行不同的操作：
         1、向websocket发送请求
         """
-        return self.handle_exception(self._handle_get)()
+        return await self._handle_get()
 
-    def _handle_get(self):
+    @handle_exception
+    async def _handle_get(self):
         """
         处理GET请求的内部方法
         """
@@ -33,23 +50,23 @@ class HttpProxy(CustomHttp):
         if not action:
             return self.http_err("缺少action参数")
 
+        # 不支持的action直接拒绝，无需查询WebSocket连接
+        handler = _GET_ACTIONS.get(action)
+        if handler is None:
+            return self.http_err(f"不支持的action: {action}")
+
         # 查询websocket客户端连接状态
         ws = self.get_ws()
         if not ws:
             return self.http_err("没有活跃的WebSocket连接")
 
         # 记录请求信息
-        logger.info(f"接收到GET请求: action={action}")
+        logger.info("接收到GET请求: action={}", action)
 
         # 根据请求参数执行不同的操作
-        if action == "do":
-            return self._handle_do_action(ws)
-        elif action == "todo":
-            return self._handle_todo_action(ws)
-        else:
-            return self.http_err(f"不支持的action: {action}")
+        return await handler(self, ws)
 
-    def _handle_do_action(self, ws) -> None:
+    async def _handle_do_action(self, ws) -> None:
         """
         处理'do'动作
 
@@ -57,17 +74,18 @@ class HttpProxy(CustomHttp):
         :return: None
         """
         # 判断ws中的属性值
-        if ws.do_status:
+        do_status = ws.do_status
+        if do_status:
             # ws中do_status=True
-            response = ws.do_status(action="do")
-            logger.debug(f"执行'do'操作成功: {response}")
+            response = do_status(action="do")
+            logger.debug("执行'do'操作成功: {}", response)
             return self.http_success(response, "操作执行成功")
         else:
             # ws中do_status=False
             logger.warning("执行'do'操作失败: 没有可播放的视频")
             return self.http_err("没有可播放的视频")
 
-    def _handle_todo_action(self, ws) -> None:
+    async def _handle_todo_action(self, ws) -> None:
         """
         处理'todo'动作
 
@@ -76,16 +94,17 @@ class HttpProxy(CustomHttp):
         """
         # 不监听ws中的属性值，直接执行操作
         response = ws.do_status(action="todo")
-        logger.debug(f"执行'todo'操作成功: {response}")
+        logger.debug("执行'todo'操作成功: {}", response)
         return self.http_success(response, "操作执行成功")
 
-    def post(self):
+    async def post(self):
         """
         处理POST请求
         """
-        return self.handle_exception(self._handle_post)()
+        return await self._handle_post()
 
-    def _handle_post(self):
+    @handle_exception
+    async def _handle_post(self):
         """
         处理POST请求的内部方法
         """
@@ -96,30 +115,47 @@ class HttpProxy(CustomHttp):
             return None  # validate_params已经设置了错误响应
 
         action = params["action"]
-        logger.info(f"接收到POST请求: action={action}")
+        logger.info("接收到POST请求: action={}", action)
+
+        # 驻留短action字符串，使分发表查找走指针比较的快速路径
+        if isinstance(action, str) and len(action) < 20:
+            action = sys.intern(action)
 
         # 查询websocket客户端连接状态
         ws = self.get_ws()
         if not ws:
             return self.http_err("没有活跃的WebSocket连接")
 
+        # 结构相同的简单操作走统一的分发方法
+        simple = _SIMPLE_ACTIONS.get(action)
+        if simple:
+            return self._dispatch_simple(ws, action, *simple)
+
         # 根据action执行不同操作
-        action_handlers = {
-            "play": self._handle_play_action,
-            "pause": self._handle_pause_action,
-            "stop": self._handle_stop_action,
-            "seek": self._handle_seek_action,
-            "volume": self._handle_volume_action,
-            "status": self._handle_status_action,
-        }
-
-        handler = action_handlers.get(action)
+        handler = _POST_ACTIONS.get(action)
         if handler:
-            return handler(ws, params)
+            return await handler(self, ws, params)
         else:
             return self.http_err(f"不支持的action: {action}")
 
-    def _handle_play_action(self, ws, params: Dict[str, Any]) -> None:
+    def _dispatch_simple(self, ws, action: str, success_msg: str, err_msg: Optional[str]) -> None:
+        """
+        处理只需调用do_status的简单操作(pause/stop/status)
+
+        @param ws: WebSocket连接
+        @param action: 操作名称
+        @param success_msg: 成功时的提示信息
+        @param err_msg: do_status不可用时的错误信息，为None时不做检查
+        :return: None
+        """
+        do_status = ws.do_status
+        if err_msg is not None and not do_status:
+            return self.http_err(err_msg)
+
+        response = do_status(action=action)
+        return self.http_success(response, success_msg)
+
+    async def _handle_play_action(self, ws, params: Dict[str, Any]) -> None:
         """
         处理播放操作
 
@@ -132,47 +168,20 @@ class HttpProxy(CustomHttp):
         if video_path:
             # 通知WebSocket客户端播放指定视频
             notification = {"action": "play", "video_path": video_path}
-            if self.notify_ws(notification):
-                return self.http_success({"status": "playing", "video_path": video_path}, "开始播放视频")
+            if await self.notify_ws(notification):
+                return self.http_success({"video_status": "playing", "video_path": video_path}, "开始播放视频")
             else:
                 return self.http_err("通知WebSocket客户端失败")
         else:
             # 如果没有指定视频路径，则播放当前视频
-            if ws.do_status:
-                response = ws.do_status(action="play")
+            do_status = ws.do_status
+            if do_status:
+                response = do_status(action="play")
                 return self.http_success(response, "继续播放视频")
             else:
                 return self.http_err("没有可播放的视频")
 
-    def _handle_pause_action(self, ws, params: Dict[str, Any]) -> None:
-        """
-        处理暂停操作
-
-        @param ws: WebSocket连接
-        @param params: 请求参数
-        :return: None
-        """
-        if ws.do_status:
-            response = ws.do_status(action="pause")
-            return self.http_success(response, "视频已暂停")
-        else:
-            return self.http_err("没有正在播放的视频")
-
-    def _handle_stop_action(self, ws, params: Dict[str, Any]) -> None:
-        """
-        处理停止操作
-
-        @param ws: WebSocket连接
-        @param params: 请求参数
-        :return: None
-        """
-        if ws.do_status:
-            response = ws.do_status(action="stop")
-            return self.http_success(response, "视频已停止")
-        else:
-            return self.http_err("没有正在播放的视频")
-
-    def _handle_seek_action(self, ws, params: Dict[str, Any]) -> None:
+    async def _handle_seek_action(self, ws, params: Dict[str, Any]) -> None:
         """
         处理跳转操作
 
@@ -181,21 +190,21 @@ class HttpProxy(CustomHttp):
         :return: None
         """
         position = params.get("position")
-        if not position:
+        if position is None or position == "":
             return self.http_err("缺少position参数")
 
-        try:
-            position = float(position)
-        except ValueError:
+        position = _to_finite_float(position)
+        if position is None:
             return self.http_err("position参数必须是数字")
 
-        if ws.do_status:
-            response = ws.do_status(action="seek", position=position)
+        do_status = ws.do_status
+        if do_status:
+            response = do_status(action="seek", position=position)
             return self.http_success(response, f"视频已跳转到 {position} 秒")
         else:
             return self.http_err("没有正在播放的视频")
 
-    def _handle_volume_action(self, ws, params: Dict[str, Any]) -> None:
+    async def _handle_volume_action(self, ws, params: Dict[str, Any]) -> None:
         """
         处理音量调节操作
 
@@ -207,37 +216,27 @@ class HttpProxy(CustomHttp):
         if volume is None:
             return self.http_err("缺少volume参数")
 
-        try:
-            volume = float(volume)
-            if not 0 <= volume <= 1:
-                return self.http_err("volume参数必须在0到1之间")
-        except ValueError:
+        volume = _to_finite_float(volume)
+        if volume is None:
             return self.http_err("volume参数必须是数字")
+        if not 0 <= volume <= 1:
+            return self.http_err("volume参数必须在0到1之间")
 
-        if ws.do_status:
-            response = ws.do_status(action="volume", volume=volume)
+        do_status = ws.do_status
+        if do_status:
+            response = do_status(action="volume", volume=volume)
             return self.http_success(response, f"音量已设置为 {volume}")
         else:
             return self.http_err("没有正在播放的视频")
 
-    def _handle_status_action(self, ws, params: Dict[str, Any]) -> None:
-        """
-        处理获取状态操作
-
-        @param ws: WebSocket连接
-        @param params: 请求参数
-        :return: None
-        """
-        response = ws.do_status(action="status")
-        return self.http_success(response, "获取状态成功")
-
-    def put(self):
+    async def put(self):
         """
         处理PUT请求
         """
-        return self.handle_exception(self._handle_put)()
+        return await self._handle_put()
 
-    def _handle_put(self):
+    @handle_exception
+    async def _handle_put(self):
         """
         处理PUT请求的内部方法
         """
@@ -250,7 +249,12 @@ class HttpProxy(CustomHttp):
         action = params["action"]
         data = params["data"]
 
-        logger.info(f"接收到PUT请求: action={action}")
+        logger.info("接收到PUT请求: action={}", action)
+
+        # 不支持的action直接拒绝，无需查询WebSocket连接
+        handler = _PUT_ACTIONS.get(action)
+        if handler is None:
+            return self.http_err(f"不支持的action: {action}")
 
         # 查询websocket客户端连接状态
         ws = self.get_ws()
@@ -258,24 +262,31 @@ class HttpProxy(CustomHttp):
             return self.http_err("没有活跃的WebSocket连接")
 
         # 根据action执行不同操作
-        if action == "update_config":
-            # 更新配置
-            try:
-                ws.update_config(data)
-                return self.http_success({"status": "updated"}, "配置已更新")
-            except Exception as e:
-                logger.error(f"更新配置失败: {str(e)}")
-                return self.http_err(f"更新配置失败: {str(e)}")
-        else:
-            return self.http_err(f"不支持的action: {action}")
+        return await handler(self, ws, data)
+
+    async def _handle_update_config(self, ws, data) -> None:
+        """
+        处理'update_config'动作，更新配置
 
-    def delete(self):
+        @param ws: WebSocket连接
+        @param data: 配置数据
+        :return: None
+        """
+        try:
+            ws.update_config(data)
+            return self.http_success({"status": "updated"}, "配置已更新")
+        except Exception as e:
+            logger.error("更新配置失败: {}", e)
+            return self.http_err(f"更新配置失败: {str(e)}")
+
+    async def delete(self):
         """
         处理DELETE请求
         """
-        return self.handle_exception(self._handle_delete)()
+        return await self._handle_delete()
 
-    def _handle_delete(self):
+    @handle_exception
+    async def _handle_delete(self):
         """
         处理DELETE请求的内部方法
         """
@@ -288,7 +299,12 @@ class HttpProxy(CustomHttp):
         action = params["action"]
         item_id = params["id"]
 
-        logger.info(f"接收到DELETE请求: action={action}, id={item_id}")
+        logger.info("接收到DELETE请求: action={}, id={}", action, item_id)
+
+        # 不支持的action直接拒绝，无需查询WebSocket连接
+        handler = _DELETE_ACTIONS.get(action)
+        if handler is None:
+            return self.http_err(f"不支持的action: {action}")
 
         # 查询websocket客户端连接状态
         ws = self.get_ws()
@@ -296,13 +312,53 @@ class HttpProxy(CustomHttp):
             return self.http_err("没有活跃的WebSocket连接")
 
         # 根据action执行不同操作
-        if action == "remove_item":
-            # 删除项目
-            try:
-                result = ws.remove_item(item_id)
-                return self.http_success(result, "项目已删除")
-            except Exception as e:
-                logger.error(f"删除项目失败: {str(e)}")
-                return self.http_err(f"删除项目失败: {str(e)}")
-        else:
-            return self.http_err(f"不支持的action: {action}")
+        return await handler(self, ws, item_id)
+
+    async def _handle_remove_item(self, ws, item_id) -> None:
+        """
+        处理'remove_item'动作，删除项目
+
+        @param ws: WebSocket连接
+        @param item_id: 项目ID
+        :return: None
+        """
+        try:
+            result = ws.remove_item(item_id)
+            return self.http_success(result, "项目已删除")
+        except Exception as e:
+            logger.error("删除项目失败: {}", e)
+            return self.http_err(f"删除项目失败: {str(e)}")
+
+
+# GET请求action到处理方法的映射
+_GET_ACTIONS = {
+    "do": HttpProxy._handle_do_action,
+    "todo": HttpProxy._handle_todo_action,
+}
+
+# POST请求action到处理方法的映射，键已驻留
+_POST_ACTIONS = {
+    sys.intern(action): getattr(HttpProxy, handler_name)
+    for action, handler_name in (
+        ("play", "_handle_play_action"),
+        ("seek", "_handle_seek_action"),
+        ("volume", "_handle_volume_action"),
+    )
+}
+
+# 简单操作: action -> (成功提示, do_status不可用时的错误信息)
+_SIMPLE_ACTIONS = {
+    sys.intern("pause"): ("视频已暂停", "没有正在播放的视频"),
+    sys.intern("stop"): ("视频已停止", "没有正在播放的视频"),
+    sys.intern("status"): ("获取状态成功", None),
+}
+
+# PUT请求action到处理方法的映射
+_PUT_ACTIONS = {
+    "update_config": HttpProxy._handle_update_config,
+}
+
+# DELETE请求action到处理方法的映射
+_DELETE_ACTIONS = {
+    "remove_item": HttpProxy._handle_remove_item,
+}
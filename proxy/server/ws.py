@@ -8,9 +8,12 @@
 
 import asyncio
 import datetime
-import json
+import time
 import uuid
-from typing import Dict, Any
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Union
+
+import orjson
 
 from logic.config import get_logger
 from proxy.custom.wss import CustomWebSocket
@@ -18,6 +21,41 @@ from proxy.custom.wss import CustomWebSocket
 # 创建一个WsProxy专用的日志器
 ws_logger = get_logger("proxy")
 
+# 时间戳缓存：1毫秒内的多次取值复用同一个ISO字符串
+_TS_CACHE = {"t": 0.0, "s": ""}
+
+
+def _now_iso() -> str:
+    """返回当前时间的ISO字符串，1毫秒内的调用共用一次格式化结果"""
+    t = time.time()
+    if abs(t - _TS_CACHE["t"]) > 0.001:  # abs: 系统时钟回拨时也刷新
+        _TS_CACHE["t"] = t
+        _TS_CACHE["s"] = datetime.datetime.fromtimestamp(t).isoformat()
+    return _TS_CACHE["s"]
+
+
+@dataclass(slots=True)
+class VideoState:
+    """视频状态"""
+
+    video_status: str = "stopped"  # stopped, playing, paused；与响应的status区分
+    current_video: Optional[str] = None  # 当前视频路径
+    position: int = 0  # 播放位置
+    duration: int = 0  # 视频时长
+    last_update: str = ""  # 最后更新时间
+    server_time: str = ""  # 服务器时间
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为状态更新字段，字段名即发送时的键名"""
+        return {
+            "video_status": self.video_status,
+            "current_video": self.current_video,
+            "position": self.position,
+            "duration": self.duration,
+            "last_update": self.last_update,
+            "server_time": self.server_time,
+        }
+
 
 class WsProxy(CustomWebSocket):
     """
@@ -52,14 +90,11 @@ class WsProxy(CustomWebSocket):
         # 设置为多连接模式
         self.holdon = True
 
+        # 同一轮事件循环内已安排状态广播，后续状态变更合并到这次广播
+        self._broadcast_pending = False
+
         # 视频状态
-        self.video_state = {
-            "status": "stopped",  # stopped, playing, paused
-            "current_video": None,
-            "position": 0,
-            "duration": 0,
-            "last_update": datetime.datetime.now().isoformat(),
-        }
+        self.video_state = VideoState(last_update=_now_iso())
 
         # 初始化父类
         super().__init__(*args, **kwargs)
@@ -77,39 +112,39 @@ class WsProxy(CustomWebSocket):
         welcome_message = {
             "type": "welcome",
             "message": "欢迎连接到Titan WebSocket服务",
-            "server_time": datetime.datetime.now().isoformat(),
+            "server_time": _now_iso(),
             "client_id": self.client_id,
         }
         self._send_message(welcome_message)
 
-        # 发送当前状态
-        # self._send_status_update()
-        asyncio.create_task(self._send_status_update())
+        # 发送当前状态，加入发送队列而不是创建任务
+        self._async_write_message(self._build_status_update())
 
-    def on_message(self, message: str):
+    def on_message(self, message: Union[str, bytes]):
         """处理接收到的WebSocket消息"""
-        self.logger.debug(f"收到消息: {message[:100]}...")
+        self.logger.debug("收到消息: {}...", message[:100])
 
         try:
-            # 解析消息并添加到消息队列，让异步处理器处理
-            data = json.loads(message)
-            asyncio.create_task(self.message_queue.put(data))
+            data = orjson.loads(message)
 
             # 不再直接调用父类的on_message方法
             # 而是记录消息统计信息
             self.message_count += 1
             self.bytes_received += len(message)
 
-        except json.JSONDecodeError:
+            # 添加到消息队列，让异步处理器处理；队列已满时返回的协程由Tornado等待，暂停读取
+            return self._enqueue_received(data)
+
+        except orjson.JSONDecodeError:
             self.logger.error("收到无效的JSON消息")
-            asyncio.create_task(self._send_response("error", "无效的JSON格式", type="json_error"))
+            self._async_write_message({"status": "error", "message": "无效的JSON格式", "type": "json_error"})
         except Exception as e:
             self.logger.exception(f"处理消息时出错: {str(e)}")
 
     def on_close(self):
         """处理WebSocket连接关闭事件"""
-        close_code = self.close_code if hasattr(self, "close_code") else None
-        close_reason = self.close_reason if hasattr(self, "close_reason") else "未知原因"
+        close_code = self.close_code
+        close_reason = self.close_reason or "未知原因"
 
         self.logger.info(f"WebSocket连接已关闭: 代码={close_code}, 原因={close_reason}")
 
@@ -122,12 +157,12 @@ class WsProxy(CustomWebSocket):
     def check_origin(self, origin):
         """检查请求来源是否允许连接"""
         # 在生产环境中应该实现更严格的来源检查
-        self.logger.debug(f"检查连接来源: {origin}")
+        self.logger.debug("检查连接来源: {}", origin)
         return True  # 允许所有来源连接
 
     async def _handle_play_video(self, data: Dict[str, Any]):
         """处理播放视频命令"""
-        video_path = data.get("video_path", self.video_state.get("current_video"))
+        video_path = data.get("video_path", self.video_state.current_video)
 
         if not video_path:
             await self._send_response("error", "未指定视频路径", type="play_error")
@@ -136,71 +171,59 @@ class WsProxy(CustomWebSocket):
         self.logger.info(f"开始播放视频: {video_path}")
 
         # 更新视频状态
-        self.video_state.update(
-            {
-                "status": "playing",
-                "current_video": video_path,
-                "position": data.get("position", 0),
-                "last_update": datetime.datetime.now().isoformat(),
-            }
-        )
+        self.video_state.video_status = "playing"
+        self.video_state.current_video = video_path
+        self.video_state.position = data.get("position", 0)
+        self.video_state.last_update = _now_iso()
 
         # 发送状态更新
         await self._send_response(
             "success",
             "开始播放视频",
             type="video_status",
-            status="playing",
+            video_status="playing",
             video_path=video_path,
-            position=self.video_state["position"],
+            position=self.video_state.position,
         )
 
         # 广播状态变更
-        await self._broadcast_status_change()
+        self._schedule_broadcast()
 
     async def _handle_pause_video(self, data: Dict[str, Any]):
         """处理暂停视频命令"""
-        if self.video_state["status"] != "playing":
+        if self.video_state.video_status != "playing":
             await self._send_response("error", "视频未在播放中", type="pause_error")
             return
 
         self.logger.info("暂停视频播放")
 
         # 更新视频状态
-        self.video_state.update(
-            {
-                "status": "paused",
-                "position": data.get("position", self.video_state["position"]),
-                "last_update": datetime.datetime.now().isoformat(),
-            }
-        )
+        self.video_state.video_status = "paused"
+        self.video_state.position = data.get("position", self.video_state.position)
+        self.video_state.last_update = _now_iso()
 
         # 发送状态更新
         await self._send_response(
-            "success", "视频已暂停", type="video_status", status="paused", position=self.video_state["position"]
+            "success", "视频已暂停", type="video_status", video_status="paused", position=self.video_state.position
         )
 
         # 广播状态变更
-        await self._broadcast_status_change()
+        self._schedule_broadcast()
 
     async def _handle_stop_video(self, data: Dict[str, Any]):
         """处理停止视频命令"""
         self.logger.info("停止视频播放")
 
         # 更新视频状态
-        self.video_state.update(
-            {
-                "status": "stopped",
-                "position": 0,
-                "last_update": datetime.datetime.now().isoformat(),
-            }
-        )
+        self.video_state.video_status = "stopped"
+        self.video_state.position = 0
+        self.video_state.last_update = _now_iso()
 
         # 发送状态更新
-        await self._send_response("success", "视频已停止", type="video_status", status="stopped")
+        await self._send_response("success", "视频已停止", type="video_status", video_status="stopped")
 
         # 广播状态变更
-        await self._broadcast_status_change()
+        self._schedule_broadcast()
 
     async def _handle_set_video_path(self, data: Dict[str, Any]):
         """处理设置视频路径命令"""
@@ -213,13 +236,9 @@ class WsProxy(CustomWebSocket):
         self.logger.info(f"设置视频路径: {video_path}")
 
         # 更新视频状态
-        self.video_state.update(
-            {
-                "current_video": video_path,
-                "position": 0,
-                "last_update": datetime.datetime.now().isoformat(),
-            }
-        )
+        self.video_state.current_video = video_path
+        self.video_state.position = 0
+        self.video_state.last_update = _now_iso()
 
         # 发送状态更新
         await self._send_response("success", "视频路径已设置", type="video_path_set", video_path=video_path)
@@ -233,7 +252,9 @@ class WsProxy(CustomWebSocket):
             await self._send_response("error", "缺少命令名称", type="command_error")
             return
 
-        self.logger.info(f"执行命令: {command}, 参数: {json.dumps(params, ensure_ascii=False)}")
+        self.logger.opt(lazy=True).debug(
+            "执行命令: {}, 参数: {}", lambda: command, lambda: orjson.dumps(params).decode()
+        )
 
         # 扩展的命令处理
         if command == "get_status":
@@ -241,61 +262,62 @@ class WsProxy(CustomWebSocket):
             return
 
         if command == "sync_clients":
-            await self._broadcast_status_change()
+            self._schedule_broadcast()
             return
 
         # 调用父类的命令处理
         await super()._handle_command(data)
 
-    async def _send_status_update(self):
-        """发送当前状态更新"""
+    def _build_status_update(self) -> Dict[str, Any]:
+        """构建当前状态更新响应"""
         # 添加服务器时间戳
-        self.video_state["server_time"] = datetime.datetime.now().isoformat()
+        self.video_state.server_time = _now_iso()
 
-        # await self._send_response("success", "状态更新", type="status_update", **self.video_state)
+        return {"status": "success", "message": "状态更新", "type": "status_update", **self.video_state.to_dict()}
 
+    async def _send_status_update(self):
         """发送当前状态更新"""
-        # 添加服务器时间戳
-        self.video_state["server_time"] = datetime.datetime.now().isoformat()
+        await self._safe_write_message(orjson.dumps(self._build_status_update()))
 
-        # 创建一个不包含status键的副本
-        video_state_copy = self.video_state.copy()
-        if "status" in video_state_copy:
-            # 将status值保存为video_status
-            video_status = video_state_copy.pop("status")
-            video_state_copy["video_status"] = video_status  # 使用不同的键名
+    def _schedule_broadcast(self):
+        """安排状态广播，同一轮事件循环内的多次状态变更只广播一次最新状态"""
+        if self._broadcast_pending:
+            return
+        self._broadcast_pending = True
+        asyncio.get_running_loop().call_soon(self._flush_broadcast)
 
-        # 使用修改后的字典调用_send_response
-        await self._send_response("success", "状态更新", type="status_update", **video_state_copy)
+    def _flush_broadcast(self):
+        """广播合并后的最新状态"""
+        self._broadcast_pending = False
+        self._broadcast_status_change()
 
-    async def _broadcast_status_change(self):
-        """广播状态变更到所有连接的客户端"""
+    def _broadcast_status_change(self):
+        """广播状态变更到所有连接的客户端，消息加入各客户端的发送队列"""
         # 获取WebSocket连接映射
-        ws_map = self.application.settings.get("ws_handler_map", {})
+        ws_map = self.application.ws_handler_map
 
         # 准备状态消息
         status_message = {
             "type": "status_change",
-            "status": self.video_state["status"],
-            "video_path": self.video_state["current_video"],
-            "position": self.video_state["position"],
-            "server_time": datetime.datetime.now().isoformat(),
+            "video_status": self.video_state.video_status,
+            "video_path": self.video_state.current_video,
+            "position": self.video_state.position,
+            "server_time": _now_iso(),
         }
 
-        # 转换为JSON字符串
-        message_json = json.dumps(status_message, ensure_ascii=False)
+        # 序列化为UTF-8 JSON字节，所有客户端共用，作为文本帧发送
+        message_json = orjson.dumps(status_message)
 
         # 广播到所有客户端
         broadcast_count = 0
         for client_id, handler in ws_map.items():
-            if client_id != "websocket_id" and handler != self:
-                try:
-                    handler.send_message(message_json)
+            if handler is not self:
+                if handler.send_message(message_json):
                     broadcast_count += 1
-                except Exception as e:
-                    self.logger.error(f"广播状态到客户端 {client_id} 失败: {str(e)}")
+                else:
+                    self.logger.error("广播状态到客户端 {} 失败", client_id)
 
-        self.logger.info(f"状态变更已广播到 {broadcast_count} 个客户端")
+        self.logger.debug("状态变更已广播到 {} 个客户端", broadcast_count)
 
     def _cleanup_resources(self):
         """清理资源"""
@@ -314,75 +336,59 @@ class WsProxy(CustomWebSocket):
             Dict: 操作结果
         """
         if action == "play":
-            self.video_state.update(
-                {
-                    "status": "playing",
-                    "last_update": datetime.datetime.now().isoformat(),
-                }
-            )
-            # 异步发送状态更新
-            asyncio.create_task(self._broadcast_status_change())
-            return {"status": "playing", "video": self.video_state["current_video"]}
+            self.video_state.video_status = "playing"
+            self.video_state.last_update = _now_iso()
+            # 安排状态广播，连续操作合并为一次
+            self._schedule_broadcast()
+            return {"video_status": "playing", "video": self.video_state.current_video}
 
         elif action == "pause":
-            self.video_state.update(
-                {
-                    "status": "paused",
-                    "last_update": datetime.datetime.now().isoformat(),
-                }
-            )
-            # 异步发送状态更新
-            asyncio.create_task(self._broadcast_status_change())
-            return {"status": "paused", "position": self.video_state["position"]}
+            self.video_state.video_status = "paused"
+            self.video_state.last_update = _now_iso()
+            # 安排状态广播，连续操作合并为一次
+            self._schedule_broadcast()
+            return {"video_status": "paused", "position": self.video_state.position}
 
         elif action == "stop":
-            self.video_state.update(
-                {
-                    "status": "stopped",
-                    "position": 0,
-                    "last_update": datetime.datetime.now().isoformat(),
-                }
-            )
-            # 异步发送状态更新
-            asyncio.create_task(self._broadcast_status_change())
-            return {"status": "stopped"}
+            self.video_state.video_status = "stopped"
+            self.video_state.position = 0
+            self.video_state.last_update = _now_iso()
+            # 安排状态广播，连续操作合并为一次
+            self._schedule_broadcast()
+            return {"video_status": "stopped"}
 
         elif action == "set_video":
             video_path = kwargs.get("video_path")
             if not video_path:
                 return {"status": "error", "message": "未指定视频路径"}
 
-            self.video_state.update(
-                {
-                    "current_video": video_path,
-                    "position": 0,
-                    "last_update": datetime.datetime.now().isoformat(),
-                }
-            )
-            # 异步发送状态更新
-            asyncio.create_task(self._broadcast_status_change())
+            self.video_state.current_video = video_path
+            self.video_state.position = 0
+            self.video_state.last_update = _now_iso()
+            # 安排状态广播，连续操作合并为一次
+            self._schedule_broadcast()
             return {"status": "ready", "video": video_path}
 
         elif action == "get_status":
             return {
-                "status": self.video_state["status"],
-                "video": self.video_state["current_video"],
-                "position": self.video_state["position"],
-                "duration": self.video_state["duration"],
-                "last_update": self.video_state["last_update"],
+                "video_status": self.video_state.video_status,
+                "video": self.video_state.current_video,
+                "position": self.video_state.position,
+                "duration": self.video_state.duration,
+                "last_update": self.video_state.last_update,
             }
 
         elif action == "set_position":
             position = kwargs.get("position", 0)
-            self.video_state["position"] = position
-            self.video_state["last_update"] = datetime.datetime.now().isoformat()
-            # 异步发送状态更新
-            asyncio.create_task(self._broadcast_status_change())
-            return {"status": self.video_state["status"], "position": position}
+            self.video_state.position = position
+            self.video_state.last_update = _now_iso()
+            # 安排状态广播，连续操作合并为一次
+            self._schedule_broadcast()
+            return {"video_status": self.video_state.video_status, "position": position}
 
         elif action == "set_duration":
             duration = kwargs.get("duration", 0)
-            self.video_state["duration"] = duration
+            self.video_state.duration = duration
             return {"status": "success", "duration": duration}
 
         else:
@@ -402,12 +408,9 @@ class WsProxy(CustomWebSocket):
         if not msg_type:
             return await self._send_response("error", "消息缺少类型字段", type="message_error")
 
-        # 查找对应的处理方法
-        handler_name = self.MESSAGE_TYPES.get(msg_type)
-
-        if handler_name and hasattr(self, handler_name):
-            # 调用对应的处理方法
-            handler = getattr(self, handler_name)
+        # 查找对应的处理方法（初始化时由MESSAGE_TYPES构建的绑定方法表）
+        handler = self._message_handlers.get(msg_type)
+        if handler:
             return await handler(data)
 
         # 如果没有找到对应的处理方法，尝试使用父类的处理方法
@@ -429,16 +432,14 @@ class WsProxy(CustomWebSocket):
             "type": "notification",
             "notification_type": notification_type,
             "message": message,
-            "timestamp": datetime.datetime.now().isoformat(),
+            "timestamp": _now_iso(),
             **kwargs,
         }
 
-        try:
-            self.send_message(json.dumps(notification, ensure_ascii=False))
-            return True
-        except Exception as e:
-            self.logger.error(f"发送通知失败: {str(e)}")
+        if not self._send_message(notification):
+            self.logger.error("发送通知失败")
             return False
+        return True
 
     async def broadcast_notification(self, notification_type, message, **kwargs):
         """
@@ -452,32 +453,34 @@ class WsProxy(CustomWebSocket):
         Returns:
             int: 成功发送的客户端数量
         """
+        return self._broadcast_notification(notification_type, message, **kwargs)
+
+    def _broadcast_notification(self, notification_type, message, **kwargs):
+        """广播通知消息到所有客户端，消息加入各客户端的发送队列，返回成功入队的客户端数量"""
         # 获取WebSocket连接映射
-        ws_map = self.application.settings.get("ws_handler_map", {})
+        ws_map = self.application.ws_handler_map
 
         # 准备通知消息
         notification = {
             "type": "notification",
             "notification_type": notification_type,
             "message": message,
-            "timestamp": datetime.datetime.now().isoformat(),
+            "timestamp": _now_iso(),
             **kwargs,
         }
 
-        # 转换为JSON字符串
-        message_json = json.dumps(notification, ensure_ascii=False)
+        # 序列化为UTF-8 JSON字节，所有客户端共用，作为文本帧发送
+        message_json = orjson.dumps(notification, option=orjson.OPT_NON_STR_KEYS)
 
         # 广播到所有客户端
         success_count = 0
         for client_id, handler in ws_map.items():
-            if client_id != "websocket_id":
-                try:
-                    handler.send_message(message_json)
-                    success_count += 1
-                except Exception as e:
-                    self.logger.error(f"广播通知到客户端 {client_id} 失败: {str(e)}")
-
-        self.logger.info(f"通知已广播到 {success_count} 个客户端")
+            if handler.send_message(message_json):
+                success_count += 1
+            else:
+                self.logger.error("广播通知到客户端 {} 失败", client_id)
+
+        self.logger.debug("通知已广播到 {} 个客户端", success_count)
         return success_count
 
     def handle_video_event(self, event_type, **kwargs):
@@ -491,41 +494,29 @@ class WsProxy(CustomWebSocket):
         Returns:
             Dict: 处理结果
         """
-        self.logger.info(f"处理视频事件: {event_type}")
+        self.logger.debug("处理视频事件: {}", event_type)
 
         if event_type == "loaded":
             # 视频加载完成
             duration = kwargs.get("duration", 0)
-            self.video_state.update(
-                {
-                    "duration": duration,
-                    "last_update": datetime.datetime.now().isoformat(),
-                }
-            )
+            self.video_state.duration = duration
+            self.video_state.last_update = _now_iso()
 
-            # 异步广播通知
-            asyncio.create_task(
-                self.broadcast_notification(
-                    "video_loaded", "视频已加载", video_path=self.video_state["current_video"], duration=duration
-                )
+            # 通知加入各客户端的发送队列
+            self._broadcast_notification(
+                "video_loaded", "视频已加载", video_path=self.video_state.current_video, duration=duration
             )
 
             return {"status": "success", "event": "loaded", "duration": duration}
 
         elif event_type == "ended":
             # 视频播放结束
-            self.video_state.update(
-                {
-                    "status": "stopped",
-                    "position": 0,
-                    "last_update": datetime.datetime.now().isoformat(),
-                }
-            )
+            self.video_state.video_status = "stopped"
+            self.video_state.position = 0
+            self.video_state.last_update = _now_iso()
 
-            # 异步广播通知
-            asyncio.create_task(
-                self.broadcast_notification("video_ended", "视频播放结束", video_path=self.video_state["current_video"])
-            )
+            # 通知加入各客户端的发送队列
+            self._broadcast_notification("video_ended", "视频播放结束", video_path=self.video_state.current_video)
 
             return {"status": "success", "event": "ended"}
 
@@ -533,14 +524,12 @@ class WsProxy(CustomWebSocket):
             # 视频播放错误
             error_message = kwargs.get("error", "未知错误")
 
-            # 异步广播通知
-            asyncio.create_task(
-                self.broadcast_notification(
-                    "video_error",
-                    f"视频播放错误: {error_message}",
-                    video_path=self.video_state["current_video"],
-                    error=error_message,
-                )
+            # 通知加入各客户端的发送队列
+            self._broadcast_notification(
+                "video_error",
+                f"视频播放错误: {error_message}",
+                video_path=self.video_state.current_video,
+                error=error_message,
             )
 
             return {"status": "error", "event": "error", "message": error_message}
@@ -0,0 +1,7 @@
+"""
+@Project ：Titan
+@File    ：__init__.py
+@Author  ：PySuper
+@Date    ：2026/10/15 10:00
+@Desc    ：Titan proxy tests
+"""
@@ -0,0 +1,141 @@
+"""
+@Project ：Titan
+@File    ：test_wss.py
+@Author  ：PySuper
+@Date    ：2026/10/15 10:00
+@Desc    ：WebSocket 发送队列、接收背压、通知合并、编码协商与状态字段测试
+"""
+
+import asyncio
+from unittest import mock
+
+import msgpack
+import orjson
+import tornado.testing
+import tornado.websocket
+
+from proxy.custom.app import CustomApplication
+from proxy.server import WsProxy
+
+
+def decode(message):
+    """二进制帧按MessagePack解码，文本帧按JSON解码"""
+    return msgpack.unpackb(message) if isinstance(message, bytes) else orjson.loads(message)
+
+
+class WsProxyTestCase(tornado.testing.AsyncHTTPTestCase):
+    """WebSocket服务端测试，每个用例使用独立的应用和连接表"""
+
+    def setUp(self):
+        super().setUp()
+        self.conns = []
+
+    def tearDown(self):
+        # 在事件循环关闭前断开客户端，让服务端on_close清理各连接的后台任务
+        for conn in self.conns:
+            conn.close()
+        self.io_loop.run_sync(lambda: asyncio.sleep(0.05))
+        super().tearDown()
+
+    def get_app(self):
+        return CustomApplication([(r"/ws", WsProxy)])
+
+    async def connect(self, query: str = ""):
+        """
+        建立连接并读完open时发送的欢迎消息和状态消息
+        :return: (客户端连接, 服务端handler)
+        """
+        conn = await tornado.websocket.websocket_connect(f"ws://127.0.0.1:{self.get_http_port()}/ws{query}")
+        self.conns.append(conn)
+        welcome = await self.read_until(conn, "welcome")
+        await self.read_until(conn, "status_update")
+        return conn, self._app.ws_handler_map[welcome["client_id"]]
+
+    async def read_until(self, conn, msg_type: str):
+        """读取消息直到出现指定类型，返回该消息"""
+        while True:
+            message = await asyncio.wait_for(conn.read_message(), 2)
+            self.assertIsNotNone(message, f"收到 {msg_type} 之前连接已关闭")
+            data = decode(message)
+            if data.get("type") == msg_type:
+                return data
+
+    @tornado.testing.gen_test
+    async def test_direct_reply_keeps_order_with_broadcast(self):
+        conn, handler = await self.connect()
+
+        # 广播和直接回复交替入队，客户端按入队顺序收到
+        for i in range(3):
+            handler._broadcast_notification("info", f"广播{i}")
+            await handler._send_response("success", f"回复{i}", type="reply")
+
+        received = []
+        for _ in range(6):
+            data = decode(await asyncio.wait_for(conn.read_message(), 2))
+            received.append(data["message"])
+        self.assertEqual(received, ["广播0", "回复0", "广播1", "回复1", "广播2", "回复2"])
+
+    @tornado.testing.gen_test
+    async def test_full_outbound_queue_closes_slow_client(self):
+        with mock.patch.object(WsProxy, "OUTBOUND_QUEUE_SIZE", 4):
+            conn, handler = await self.connect()
+
+        # 同步连续发送，写协程来不及消费，第5条时队列已满
+        results = [handler.send_message(b'{"n": %d}' % i) for i in range(6)]
+        self.assertEqual(results, [True] * 4 + [False] * 2)
+
+        while await asyncio.wait_for(conn.read_message(), 2) is not None:
+            pass
+        self.assertEqual(conn.close_code, WsProxy.SLOW_CLIENT_CLOSE_CODE)
+
+    @tornado.testing.gen_test
+    async def test_notify_batch_codec(self):
+        json_conn, json_handler = await self.connect()
+        msgpack_conn, msgpack_handler = await self.connect("?format=msgpack")
+        items = [{"type": "notification", "n": 1}, {"type": "notification", "n": 2}]
+
+        for conn, handler, frame_type in (
+            (json_conn, json_handler, str),
+            (msgpack_conn, msgpack_handler, bytes),
+        ):
+            # 同一轮事件循环内入队的通知合并为一帧
+            await asyncio.gather(*(handler.queue_notification(item) for item in items))
+            message = await asyncio.wait_for(conn.read_message(), 2)
+            self.assertIsInstance(message, frame_type)
+            self.assertEqual(decode(message), {"type": "batch", "items": items})
+
+    @tornado.testing.gen_test
+    async def test_negotiate(self):
+        conn, handler = await self.connect()
+
+        conn.write_message(orjson.dumps({"type": "negotiate", "codec": "xml"}).decode())
+        data = await self.read_until(conn, "negotiate_failed")
+        self.assertEqual(data["status"], "error")
+        self.assertEqual(data["codecs"], list(WsProxy.CODECS))
+        self.assertFalse(handler.notify_binary)
+
+        conn.write_message(orjson.dumps({"type": "negotiate", "codec": "msgpack"}).decode())
+        await self.read_until(conn, "negotiated")
+        self.assertTrue(handler.notify_binary)
+
+    @tornado.testing.gen_test
+    async def test_receive_queue_backpressure(self):
+        with mock.patch.object(WsProxy, "MESSAGE_QUEUE_SIZE", 2):
+            conn, _ = await self.connect()
+
+        # 接收队列满时暂停读取而不是丢弃，所有ping都得到回复
+        for i in range(20):
+            conn.write_message(orjson.dumps({"type": "ping", "seq": i}).decode())
+        for _ in range(20):
+            await self.read_until(conn, "pong")
+
+    @tornado.testing.gen_test
+    async def test_status_change_uses_video_status(self):
+        _, handler = await self.connect()
+        conn, _ = await self.connect()
+
+        # 播放状态与status_update一样以video_status发送，status只表示操作结果
+        self.assertEqual(handler.do_status(action="pause"), {"video_status": "paused", "position": 0})
+        data = await self.read_until(conn, "status_change")
+        self.assertEqual(data["video_status"], "paused")
+        self.assertNotIn("status", data)
@@ -26,34 +26,22 @@
 
 
 # 创建多个相似但又不完全相同的类，那么可以通过一个函数来“定制”所需要的类，避免重复大量的样板代码
-def create_class(class_name):
-    class Class:
-        def __init__(self, name, age):
-            self.name = name
-            self.age = age
-
-        def greet(self):
-            print(f"Hello, my name is {self.name} and I am {self.age} years old.")
-
-    Class.__name__ = class_name
-    return Class
-
-
-Admin = create_class("Admin")
-User = create_class("User")
-
-
-# ----------------------------------
 def create_class(class_name):
     return type(
         class_name,
         (object,),
         {
+            # 固定实例属性，实例不再创建__dict__，内存占用更小、属性访问更快
+            "__slots__": ("name", "age"),
             "__init__": lambda self, name, age: setattr(self, "name", name) or setattr(self, "age", age),
             "greet": lambda self: f"Hello, my name is {self.name} and I am {self.age} years old.",
         },
     )
 
 
-print(Admin("John Doe", 30).greet())
-print(User("Jane Smith", 25).greet())
+if __name__ == "__main__":
+    Admin = create_class("Admin")
+    User = create_class("User")
+
+    print(Admin("John Doe", 30).greet())
+    print(User("Jane Smith", 25).greet())
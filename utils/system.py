@@ -7,8 +7,37 @@
 @Desc    ：Titan system
 """
 
-import platform
-import subprocess
+import os
+
+import psutil
+
+
+def _port_pids(port):
+    """
+    获取本地监听/绑定指定端口的进程ID
+    macOS下非root用户调用psutil.net_connections()会抛出AccessDenied，
+    此时逐个进程查询其连接，跳过无权限访问的进程(当前用户的进程仍可找到)
+    @param port: 端口号
+    @return: 进程ID集合
+    """
+    try:
+        # psutil跨平台获取连接信息，只匹配本地监听/绑定该端口的进程
+        return {
+            conn.pid
+            for conn in psutil.net_connections(kind="inet")
+            if conn.pid and conn.laddr and conn.laddr.port == port
+        }
+    except psutil.AccessDenied:
+        pass
+
+    pids = set()
+    for proc in psutil.process_iter():
+        try:
+            if any(conn.laddr and conn.laddr.port == port for conn in proc.net_connections(kind="inet")):
+                pids.add(proc.pid)
+        except (psutil.AccessDenied, psutil.NoSuchProcess, psutil.ZombieProcess):
+            continue
+    return pids
 
 
 def close_port(port, logger):
@@ -28,83 +57,42 @@ def close_port(port, logger):
         return False
 
     try:
-        system = platform.system().lower()
-
-        # 根据不同操作系统选择不同处理方式
-        if system == "windows":
-            return _close_port_windows(port, logger)
-        elif system in ("linux", "darwin"):  # Linux 和 macOS
-            return _close_port_unix(port, logger)
-        else:
-            logger.error(f"不支持的操作系统: {system}")
-            return False
+        pids = _port_pids(port)
     except Exception as e:
         logger.error(f"关闭端口 {port} 时发生未知错误: {e}")
         return False
 
+    # 不终止当前进程
+    pids.discard(os.getpid())
 
-def _close_port_windows(port, logger):
-    """
-    在 Windows 系统上关闭指定端口
-    @param port: 需要关闭的端口号
-    @return: 是否成功关闭端口
-    """
-    try:
-        # 使用列表参数避免命令注入
-        cmd_find = ["netstat", "-ano"]
-        result = subprocess.run(cmd_find, capture_output=True, text=True, shell=False)
-
-        if result.returncode != 0:
-            logger.debug(f"端口 {port} 没有找到相关进程")
-            return False
-
-        found = False
-        for line in result.stdout.strip().split("\n"):
-            if f":{port}" in line:
-                parts = line.strip().split()
-                if len(parts) >= 5:
-                    pid = parts[-1]
-                    subprocess.run(["taskkill", "/PID", pid, "/F"], shell=False)
-                    logger.debug(f"已终止使用端口 {port} 的进程 (PID: {pid})")
-                    found = True
+    found = False
+    for pid in pids:
+        try:
+            psutil.Process(pid).kill()
+            logger.debug(f"已终止使用端口 {port} 的进程 (PID: {pid})")
+            found = True
+        except psutil.NoSuchProcess:
+            continue
+        except psutil.AccessDenied as e:
+            logger.warning(f"没有权限终止使用端口 {port} 的进程 (PID: {pid}): {e}")
 
-        if not found:
-            logger.debug(f"端口 {port} 没有找到相关进程")
-            return False
-        return found
-    except subprocess.SubprocessError as e:
-        logger.debug(f"端口 {port} 没有找到相关进程: {e}")
-        return False
+    if not found:
+        logger.debug(f"端口 {port} 没有找到相关进程")
+    return found
 
 
-def _close_port_unix(port, logger):
+def uvloop_loop_factory(logger):
     """
-    在 Unix-like 系统 (Linux/macOS) 上关闭指定端口
-    @param port: 需要关闭的端口号
-    @return: 是否成功关闭端口
+    获取uvloop的事件循环工厂，传给asyncio.run(..., loop_factory=...) / asyncio.Runner(loop_factory=...)
+    不再设置全局事件循环策略(asyncio.set_event_loop_policy 自Python 3.14起废弃)；
+    uvloop不支持Windows，未安装时返回None，即使用asyncio默认事件循环
+    @return: uvloop.new_event_loop 或 None
     """
     try:
-        # 使用列表参数避免命令注入
-        cmd_find = ["lsof", "-i", f":{port}"]
-        result = subprocess.run(cmd_find, capture_output=True, text=True, shell=False)
-
-        if result.returncode != 0:
-            logger.debug(f"端口 {port} 没有找到相关进程")
-            return False
+        import uvloop
+    except ImportError:
+        logger.debug("uvloop未安装，使用asyncio默认事件循环")
+        return None
 
-        found = False
-        for line in result.stdout.strip().split("\n")[1:]:  # 跳过标题行
-            parts = line.split()
-            if len(parts) >= 2:
-                pid = parts[1]
-                subprocess.run(["kill", "-9", pid], shell=False)
-                logger.debug(f"已终止使用端口 {port} 的进程 (PID: {pid})")
-                found = True
-
-        if not found:
-            logger.debug(f"端口 {port} 没有找到相关进程")
-            return False
-        return found
-    except subprocess.SubprocessError as e:
-        logger.debug(f"端口 {port} 没有找到相关进程: {e}")
-        return False
+    logger.debug("已启用uvloop事件循环")
+    return uvloop.new_event_loop